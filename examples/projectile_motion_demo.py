@@ -8,6 +8,7 @@ import json
 import os
 import sys
 import math
+import numpy as np
 import pymunk
 import pygame
 from pathlib import Path
@@ -19,8 +20,19 @@ if project_root not in sys.path:
 
 from science_simulator.core.simulation_engine import SimulationEngine
 
-def main():
-    """Run the projectile motion demo with interactive UI."""
+# Lookup tables for whole-degree launch angles from -90 to 90
+ANGLE_OFFSET = 90
+COS = np.cos(np.deg2rad(np.arange(-90, 91)))
+SIN = np.sin(np.deg2rad(np.arange(-90, 91)))
+
+def main(use_analytic: bool = True):
+    """Run the projectile motion demo with interactive UI.
+    
+    Args:
+        use_analytic: Play the flight from a closed-form trajectory and only hand
+            the projectile back to pymunk when it reaches the ground. Set to False
+            to step the physics engine for the whole flight.
+    """
     # Initialize pygame
     pygame.init()
     
@@ -48,22 +60,24 @@ def main():
     ground.friction = 1.0
     ground.elasticity = 0.8
     engine.space.add(ground)
+    engine.invalidate_shapes()
     
     # Add a projectile
-    mass = 1
     radius = 15
-    inertia = pymunk.moment_for_circle(mass, 0, radius, (0, 0))
-    body = pymunk.Body(mass, inertia)
-    body.position = 100, sim_height - 100
-    shape = pymunk.Circle(body, radius, (0, 0))
-    shape.elasticity = 0.8
-    shape.friction = 0.5
-    shape.density = 1
-    shape.color = (70, 130, 180, 255)  # Blue color with alpha
-    engine.space.add(body, shape)
+    shape = engine.add_object(
+        'projectile', 'circle',
+        x=100, y=sim_height - 100,
+        radius=radius, mass=1,
+        elasticity=0.8, friction=0.5
+    )
+    shape.color = (70, 130, 180)  # Blue, opaque
+    body = shape.body
     
-    # Store the projectile for easy access
-    engine.objects['projectile'] = {'body': body, 'shape': shape}
+    # Precomputed flight path, played back one position per frame
+    frame_dt = 1 / 60.0
+    launch_pos = (100, sim_height - 100)
+    landing_y = sim_height - 50 - 5 - radius  # Ground line minus its half-width and the ball radius
+    trajectory = {'xs': None, 'ys': None, 'frame': 0, 'landing_velocity': (0, 0)}
     
     # Add launch controls to the control panel
     if engine.control_panel:
@@ -79,13 +93,24 @@ def main():
         
         # Launch button
         def launch_projectile():
-            angle_rad = math.radians(angle_slider.get_value())
+            i = round(angle_slider.get_value()) + ANGLE_OFFSET  # Quantize to whole degrees
             velocity = velocity_slider.get_value()
-            vx = velocity * math.cos(angle_rad)
-            vy = -velocity * math.sin(angle_rad)  # Negative because y is down in Pygame
-            body.position = 100, sim_height - 100  # Reset position
+            vx = velocity * COS[i]
+            vy = -velocity * SIN[i]  # Negative because y is down in Pygame
+            body.position = launch_pos  # Reset position
             body.velocity = (vx, vy)
             
+            g = engine.space.gravity[1]
+            if use_analytic and g > 0:
+                # Time until the projectile reaches the ground line
+                t_land = (-vy + math.sqrt(vy * vy + 2 * g * (landing_y - launch_pos[1]))) / g
+                n = int(t_land / frame_dt) + 1
+                trajectory['xs'], trajectory['ys'] = engine.compute_trajectory(
+                    launch_pos[0], launch_pos[1], vx, vy, g, frame_dt, n
+                )
+                trajectory['frame'] = 0
+                trajectory['landing_velocity'] = (vx, vy + g * (n - 1) * frame_dt)
+            
         engine.control_panel.add_button("Launch!", launch_projectile)
         
         # Add a separator
@@ -118,7 +143,17 @@ def main():
         
         # Step the simulation if not paused
         if not engine.paused:
-            engine.step()
+            if trajectory['xs'] is not None:
+                # Play back the precomputed flight instead of stepping pymunk
+                i = trajectory['frame']
+                body.position = trajectory['xs'][i], trajectory['ys'][i]
+                trajectory['frame'] += 1
+                if trajectory['frame'] == len(trajectory['xs']):
+                    # Landed: hand the projectile back to pymunk for the bounce
+                    body.velocity = trajectory['landing_velocity']
+                    trajectory['xs'] = trajectory['ys'] = None
+            else:
+                engine.step(frame_dt)
         
         # Render
         engine.render()
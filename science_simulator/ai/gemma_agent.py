@@ -5,6 +5,7 @@ This module provides an agent interface to Gemma 3N for handling answer validati
 feedback generation, and educational guidance in the Science Simulation Lab.
 """
 from typing import Dict, Any, List, Optional, Tuple
+from collections import deque
 import json
 from pathlib import Path
 from .gemma_integration import Gemma3NIntegration
@@ -12,14 +13,19 @@ from .gemma_integration import Gemma3NIntegration
 class GemmaAgent:
     """Agent that uses Gemma 3N for educational interactions and answer validation."""
     
-    def __init__(self, gemma_integration: Optional[Gemma3NIntegration] = None):
+    def __init__(self, gemma_integration: Optional[Gemma3NIntegration] = None,
+                 max_history_turns: int = 6):
         """Initialize the Gemma agent.
         
         Args:
             gemma_integration: Optional pre-initialized Gemma3NIntegration instance
+            max_history_turns: Number of recent (user, assistant) exchanges kept in prompts
         """
         self.gemma = gemma_integration or Gemma3NIntegration()
-        self.conversation_history = []
+        
+        # Sliding window of exchanges; older turns drop off so prompt length stays bounded
+        self._max_history_turns = max_history_turns
+        self.conversation_history: deque = deque(maxlen=max_history_turns)
         self._initialize_prompt_templates()
     
     def _initialize_prompt_templates(self):
@@ -69,3 +75,43 @@ class GemmaAgent:
                 )
             }
         }
+    
+    def record_exchange(self, user_message: str, assistant_message: str):
+        """Add a completed exchange to the conversation history.
+        
+        Args:
+            user_message: The prompt sent on behalf of the student
+            assistant_message: The model's reply
+        """
+        self.conversation_history.append((user_message, assistant_message))
+    
+    def _format_history(self) -> str:
+        """Format the exchanges currently in the history window.
+        
+        Returns:
+            The recent conversation as prompt text, or an empty string
+        """
+        return "\n".join(
+            f"Student: {user}\nTutor: {assistant}"
+            for user, assistant in self.conversation_history
+        )
+    
+    def build_prompt(self, task: str, **fields: Any) -> str:
+        """Build the full prompt for an agent task.
+        
+        Args:
+            task: Template name ('answer_validation', 'feedback_generation', 'hint_generation')
+            **fields: Values for the placeholders in the task's user template
+            
+        Returns:
+            The system instructions, recent history and user message as one prompt
+        """
+        template = self.templates[task]
+        parts = [template['system']]
+        
+        history = self._format_history()
+        if history:
+            parts.append(f"Conversation so far:\n{history}")
+        
+        parts.append(template['user'].format(**fields))
+        return "\n\n".join(parts)
@@ -5,27 +5,183 @@ This module handles the integration with the Gemma 3N model for text-to-simulati
 conversion in the Science Simulation Lab.
 """
 import os
-import torch
-from transformers import AutoTokenizer, AutoModelForCausalLM
-from typing import Dict, Any, List, Optional
+import copy
+import functools
+from typing import TYPE_CHECKING, Callable, Dict, Any, List, Optional, Tuple
 import json
-import re
 from pathlib import Path
 
+# torch and transformers are imported where they are used so that modules which
+# never run the model (the pygame demo, the Qt app) don't pay their import cost
+if TYPE_CHECKING:
+    import torch
+    from transformers import Cache
+
+
+def _extract_json(text: str) -> Optional[str]:
+    """Find the first complete JSON object in text with a single linear scan.
+    
+    Braces inside quoted strings are ignored, so the scan never backtracks the
+    way a greedy regex does on malformed output. Quotes only count inside the
+    object, so stray quotes in text before it can't hide its braces.
+    
+    Args:
+        text: Text containing a JSON object
+        
+    Returns:
+        The text of the outermost object, or None if no balanced object is found
+    """
+    start = text.find('{')
+    if start == -1:
+        return None
+    
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        char = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"' and depth > 0:
+            in_string = True
+        elif char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return None
+
+
+@functools.lru_cache(maxsize=1)
+def _json_stopping_criteria_class():
+    """Define the JSON stopping criterion, importing transformers on first use.
+    
+    Returns:
+        The JsonBalanceStoppingCriteria class
+    """
+    import torch
+    from transformers import StoppingCriteria
+    
+    class JsonBalanceStoppingCriteria(StoppingCriteria):
+        """Stop each sequence as soon as its first JSON object is closed.
+        
+        Brace depth is tracked incrementally from the newest token of every row,
+        ignoring braces inside quoted strings, so each step costs O(batch size).
+        String state only changes inside the object, so prose before it with an
+        odd number of quotes can't hide the braces.
+        """
+        
+        def __init__(self, tokenizer, token_text: Dict[int, str]):
+            """Initialize the criterion.
+            
+            Args:
+                tokenizer: Tokenizer used to decode new tokens
+                token_text: Shared cache of token id -> decoded text, empty for
+                    tokens without braces, quotes or backslashes
+            """
+            self.tokenizer = tokenizer
+            self.token_text = token_text
+            # Per row: [depth, in_string, escaped, finished]
+            self._states = None
+        
+        def _get_text(self, token_id: int) -> str:
+            text = self.token_text.get(token_id)
+            if text is None:
+                text = self.tokenizer.decode([token_id])
+                if not any(char in text for char in '{}"\\'):
+                    text = ''
+                self.token_text[token_id] = text
+            return text
+        
+        def __call__(self, input_ids, scores, **kwargs):
+            if self._states is None:
+                self._states = [[0, False, False, False] for _ in range(input_ids.shape[0])]
+            
+            done = []
+            for state, token_id in zip(self._states, input_ids[:, -1].tolist()):
+                if not state[3]:
+                    text = self._get_text(token_id)
+                    if not text:
+                        # Nothing structural; the token can only complete an escape
+                        state[2] = False
+                    else:
+                        depth, in_string, escaped, finished = state
+                        for char in text:
+                            if in_string:
+                                if escaped:
+                                    escaped = False
+                                elif char == '\\':
+                                    escaped = True
+                                elif char == '"':
+                                    in_string = False
+                            elif char == '"' and depth > 0:
+                                in_string = True
+                            elif char == '{':
+                                depth += 1
+                            elif char == '}' and depth > 0:
+                                depth -= 1
+                                if depth == 0:
+                                    finished = True
+                                    break
+                        state[:] = [depth, in_string, escaped, finished]
+                done.append(state[3])
+            return torch.tensor(done, dtype=torch.bool, device=input_ids.device)
+    
+    return JsonBalanceStoppingCriteria
+
+
+@functools.lru_cache(maxsize=1)
+def _detect_device() -> str:
+    """Detect the best available device.
+    
+    Returns:
+        Device string ('cuda', 'mps', or 'cpu')
+    """
+    import torch
+    
+    if torch.cuda.is_available():
+        return 'cuda'
+    elif torch.backends.mps.is_available():
+        return 'mps'
+    else:
+        return 'cpu'
+
+
 class Gemma3NIntegration:
     """Handles integration with the Gemma 3N model for text-to-simulation conversion."""
     
-    def __init__(self, model_name: str = "google/gemma-3n", device: str = None):
+    def __init__(self, model_name: str = "google/gemma-3n", device: str = None,
+                 compile_model: bool = True, max_cache_len: int = 2048,
+                 quantization: Optional[str] = 'nf4'):
         """Initialize the Gemma 3N integration.
         
         Args:
             model_name: Name or path of the Gemma 3N model
             device: Device to run the model on ('cuda', 'mps', 'cpu'). If None, auto-detects.
+            compile_model: Whether to compile the model forward pass with torch.compile (CUDA only)
+            max_cache_len: Length of the static KV cache used for the template prefix
+            quantization: Weight quantization for the linear layers: 'nf4' (4-bit NormalFloat),
+                'int8' (8-bit), or None for unquantized bfloat16 weights
         """
+        if quantization not in ('nf4', 'int8', None):
+            raise ValueError(f"Unsupported quantization: {quantization}")
+        
         self.model_name = model_name
-        self.device = self._get_device(device)
+        self.quantization = quantization
+        self._device = device
+        self.compile_model = compile_model
+        self.max_cache_len = max_cache_len
         self.model = None
         self.tokenizer = None
+        self.generation_config = None
+        self.json_processor = None
+        self._token_text: Dict[int, str] = {}
         self.template_dir = Path(__file__).parent.parent / 'data' / 'prompts'
         
         # Create prompts directory if it doesn't exist
@@ -38,27 +194,32 @@ class Gemma3NIntegration:
             'biology': 'biology_template.txt',
         }
         
+        # Pre-split templates, prompt builders and prefilled prefix key/value states, per domain
+        self._templates: Dict[str, Tuple[str, Optional[str]]] = {}
+        self._template_fns: Dict[str, Callable[[str], str]] = {}
+        self._prefix_cache: Dict[str, Tuple[Any, Any]] = {}
+        
+        # Single working KV cache that generate() extends; the prefix states are copied
+        # into it in place so its tensors (and any captured CUDA graphs) are reused
+        self._work_cache = None
+        
+        # Reusable pinned host buffers for host-to-device input copies (CUDA only)
+        self._pinned_buffers: Dict[Tuple[str, Any], Any] = {}
+        self._pinned_events: Dict[Tuple[str, Any], Any] = {}
+        
         # Initialize default templates if they don't exist
         self._initialize_default_templates()
     
-    def _get_device(self, device: str = None) -> str:
-        """Determine the best available device.
+    @property
+    def device(self) -> str:
+        """Device the model runs on, auto-detected on first use if not specified.
         
-        Args:
-            device: Preferred device if specified
-            
         Returns:
             Device string ('cuda', 'mps', or 'cpu')
         """
-        if device:
-            return device
-            
-        if torch.cuda.is_available():
-            return 'cuda'
-        elif torch.backends.mps.is_available():
-            return 'mps'
-        else:
-            return 'cpu'
+        if not self._device:
+            self._device = _detect_device()
+        return self._device
     
     def _initialize_default_templates(self):
         """Initialize default prompt templates if they don't exist."""
@@ -106,21 +267,118 @@ Response:"""
     def load_model(self):
         """Load the Gemma 3N model and tokenizer."""
         if self.model is None or self.tokenizer is None:
+            import torch
+            from transformers import (
+                AutoTokenizer, AutoModelForCausalLM, BitsAndBytesConfig, GenerationConfig
+            )
+            
             print(f"Loading Gemma 3N model on {self.device}...")
             self.tokenizer = AutoTokenizer.from_pretrained(
                 self.model_name,
                 trust_remote_code=True
             )
             
-            # Load model with 4-bit quantization to reduce memory usage
-            self.model = AutoModelForCausalLM.from_pretrained(
-                self.model_name,
-                device_map="auto",
-                torch_dtype=torch.float16 if self.device == 'cuda' else torch.float32,
-                trust_remote_code=True,
-                load_in_4bit=True  # Enable 4-bit quantization
-            )
+            # Left padding keeps every prompt adjacent to its generated tokens in a batch
+            self.tokenizer.padding_side = 'left'
+            if self.tokenizer.pad_token is None:
+                self.tokenizer.pad_token = self.tokenizer.eos_token
+            
+            # Load model with bfloat16 compute; quantized linear weights reduce memory usage
+            model_kwargs = {
+                'device_map': "auto",
+                'torch_dtype': torch.bfloat16,
+                'trust_remote_code': True,
+            }
+            if self.quantization == 'nf4':
+                model_kwargs['quantization_config'] = BitsAndBytesConfig(
+                    load_in_4bit=True,
+                    bnb_4bit_quant_type='nf4',
+                    bnb_4bit_compute_dtype=torch.bfloat16,
+                    bnb_4bit_use_double_quant=True
+                )
+            elif self.quantization == 'int8':
+                model_kwargs['quantization_config'] = BitsAndBytesConfig(load_in_8bit=True)
+            try:
+                self.model = AutoModelForCausalLM.from_pretrained(
+                    self.model_name,
+                    attn_implementation=self._get_attn_implementation(),
+                    **model_kwargs
+                )
+            except (ImportError, ValueError) as e:
+                # flash-attn is not installed or not supported by this model/GPU
+                print(f"Flash attention unavailable ({e}), falling back to SDPA")
+                self.model = AutoModelForCausalLM.from_pretrained(
+                    self.model_name,
+                    attn_implementation='sdpa',
+                    **model_kwargs
+                )
+            
+            # Fixed-shape KV cache so repeated calls can reuse captured CUDA graphs
+            self.model.generation_config.cache_implementation = 'static'
             self.model.eval()
+            
+            # Gemma's pad token id is 0, so test for None rather than truthiness
+            pad_token_id = self.tokenizer.pad_token_id
+            if pad_token_id is None:
+                pad_token_id = self.tokenizer.eos_token_id
+            
+            self.generation_config = GenerationConfig(
+                max_new_tokens=1024,
+                temperature=0.7,
+                do_sample=True,
+                top_p=0.9,
+                top_k=50,
+                cache_implementation='static',
+                pad_token_id=pad_token_id
+            )
+            
+            # Constrain decoding to the simulation parameter schema when outlines is available
+            self.json_processor = self._build_json_processor()
+            
+            # Compile the forward pass; static cache shapes keep the decode graph stable
+            if self.compile_model and self.device == 'cuda':
+                self.model.forward = torch.compile(
+                    self.model.forward,
+                    mode='reduce-overhead',
+                    dynamic=False
+                )
+                self._warmup()
+    
+    def _build_json_processor(self):
+        """Build a logits processor that only allows output matching SimulationSpec.
+        
+        Returns:
+            An outlines JSON logits processor, or None if outlines is not installed
+        """
+        try:
+            from outlines.models.transformers import TransformerTokenizer
+            from outlines.processors import JSONLogitsProcessor
+        except ImportError:
+            print("outlines not installed, using unconstrained decoding")
+            return None
+        
+        from .schemas import SimulationSpec
+        return JSONLogitsProcessor(SimulationSpec, TransformerTokenizer(self.tokenizer))
+    
+    def _warmup(self):
+        """Run one short generation so compilation happens at load time, not on the first request."""
+        import torch
+        
+        inputs = self._prepare_inputs("A ball is dropped from rest.", 'physics')
+        with torch.inference_mode():
+            self.model.generate(**inputs, generation_config=self.generation_config, max_new_tokens=2)
+    
+    def _get_attn_implementation(self) -> str:
+        """Pick the attention backend for the current device.
+        
+        Returns:
+            'flash_attention_2' on Ampere or newer GPUs, 'sdpa' otherwise
+        """
+        import torch
+        
+        if self.device == 'cuda' and torch.cuda.get_device_capability()[0] >= 8:
+            return 'flash_attention_2'
+        return 'sdpa'
     
     def generate_simulation_parameters(self, exercise_text: str, domain: str = 'physics') -> Dict[str, Any]:
         """Generate simulation parameters from exercise text.
@@ -132,45 +390,350 @@ Response:"""
         Returns:
             Dictionary containing simulation parameters
         """
+        import torch
+        
         # Load model if not already loaded
         self.load_model()
         
-        # Load the appropriate template
-        template_path = self.template_dir / self.default_templates.get(domain, 'physics_template.txt')
-        with open(template_path, 'r') as f:
-            template = f.read()
-        
-        # Format the prompt
-        prompt = template.format(exercise_text=exercise_text)
+        inputs = self._prepare_inputs(exercise_text, domain)
+        prompt_length = inputs['input_ids'].shape[-1]
         
         # Generate response
-        inputs = self.tokenizer(prompt, return_tensors="pt").to(self.device)
+        with torch.inference_mode():
+            outputs = self.model.generate(
+                **inputs,
+                generation_config=self.generation_config,
+                logits_processor=self._get_logits_processor(),
+                stopping_criteria=self._get_stopping_criteria()
+            )
+        
+        # Decode only the completion; the prompt itself contains an example JSON object
+        response = self.tokenizer.decode(outputs[0][prompt_length:], skip_special_tokens=True)
+        return self._parse_response(response)
+    
+    def generate_simulation_parameters_streaming(self, exercise_text: str,
+                                                 on_token: Callable[[str], None],
+                                                 domain: str = 'physics') -> Dict[str, Any]:
+        """Generate simulation parameters, reporting text as it is decoded.
+        
+        Generation runs on a background thread and decoded text is passed to
+        on_token from the calling thread as soon as it is available.
+        
+        Args:
+            exercise_text: The exercise description
+            on_token: Callback receiving each newly decoded piece of text
+            domain: The science domain ('physics', 'chemistry', 'biology')
+            
+        Returns:
+            Dictionary containing simulation parameters
+        """
+        import threading
+        import torch
+        from transformers import TextIteratorStreamer
+        
+        # Load model if not already loaded
+        self.load_model()
+        
+        inputs = self._prepare_inputs(exercise_text, domain)
+        streamer = TextIteratorStreamer(self.tokenizer, skip_prompt=True, skip_special_tokens=True)
+        errors = []
+        
+        def run_generation():
+            try:
+                # Inference mode is thread-local, so enter it inside the worker
+                with torch.inference_mode():
+                    self.model.generate(
+                        **inputs,
+                        generation_config=self.generation_config,
+                        logits_processor=self._get_logits_processor(),
+                        stopping_criteria=self._get_stopping_criteria(),
+                        streamer=streamer
+                    )
+            except Exception as e:
+                errors.append(e)
+                streamer.end()  # Unblock the consumer loop below
+        
+        thread = threading.Thread(target=run_generation, daemon=True)
+        thread.start()
+        
+        chunks = []
+        for text in streamer:
+            chunks.append(text)
+            on_token(text)
+        thread.join()
+        
+        if errors:
+            raise errors[0]
+        return self._parse_response(''.join(chunks))
+    
+    def generate_simulation_parameters_batch(self, exercises: List[str],
+                                             domain: str = 'physics') -> List[Optional[Dict[str, Any]]]:
+        """Generate simulation parameters for several exercises in one batched pass.
         
-        with torch.no_grad():
+        Args:
+            exercises: The exercise descriptions
+            domain: The science domain shared by all exercises
+            
+        Returns:
+            One parameter dictionary per exercise, in order. Entries are None for
+            exercises whose output could not be parsed.
+        """
+        import torch
+        
+        if not exercises:
+            return []
+        
+        # Load model if not already loaded
+        self.load_model()
+        
+        # Full prompts, left-padded to a common length; the single-prompt prefix
+        # cache is not used because padding would sit between prefix and exercise
+        self._get_template(domain)
+        prompts = [self._template_fns[domain](exercise) for exercise in exercises]
+        inputs = self._to_device(self.tokenizer(prompts, padding=True, return_tensors="pt"))
+        prompt_length = inputs['input_ids'].shape[-1]
+        
+        with torch.inference_mode():
             outputs = self.model.generate(
                 **inputs,
-                max_new_tokens=1024,
-                temperature=0.7,
-                do_sample=True,
-                top_p=0.9,
-                top_k=50,
-                return_dict_in_generate=True,
-                output_scores=True
+                generation_config=self.generation_config,
+                logits_processor=self._get_logits_processor(),
+                stopping_criteria=self._get_stopping_criteria()
             )
         
-        # Decode the response
-        response = self.tokenizer.decode(outputs.sequences[0], skip_special_tokens=True)
+        results = []
+        for sequence in outputs:
+            response = self.tokenizer.decode(sequence[prompt_length:], skip_special_tokens=True)
+            try:
+                results.append(self._parse_response(response))
+            except ValueError as e:
+                print(f"Failed to parse batched model response: {e}")
+                results.append(None)
+        return results
+    
+    def _get_logits_processor(self):
+        """Build the logits processors for one generate() call.
+        
+        Returns:
+            A LogitsProcessorList, holding a fresh copy of the JSON processor if enabled
+        """
+        from transformers import LogitsProcessorList
+        
+        # The processor tracks per-sequence state, so each call gets a fresh copy
+        logits_processor = LogitsProcessorList()
+        if self.json_processor is not None:
+            logits_processor.append(self.json_processor.copy())
+        return logits_processor
+    
+    def _get_stopping_criteria(self):
+        """Build the stopping criteria for one generate() call.
+        
+        Tokens after the closing brace of the JSON object are never parsed, so
+        each sequence stops there instead of running on to EOS.
+        
+        Returns:
+            A StoppingCriteriaList holding a fresh JsonBalanceStoppingCriteria
+        """
+        from transformers import StoppingCriteriaList
         
-        # Extract JSON from the response
-        json_match = re.search(r'\{.*\}', response, re.DOTALL)
-        if not json_match:
-            raise ValueError("Could not extract JSON from model response")
+        criteria_class = _json_stopping_criteria_class()
+        return StoppingCriteriaList([criteria_class(self.tokenizer, self._token_text)])
+    
+    def _parse_response(self, response: str) -> Dict[str, Any]:
+        """Parse the decoded model completion into simulation parameters.
+        
+        Args:
+            response: Decoded completion text
+            
+        Returns:
+            Dictionary containing simulation parameters
+            
+        Raises:
+            ValueError: If no valid JSON object could be parsed
+        """
+        # Constrained output is the JSON object itself; otherwise extract it from the text
+        if self.json_processor is None:
+            response = _extract_json(response)
+            if response is None:
+                raise ValueError("Could not extract JSON from model response")
         
         try:
-            return json.loads(json_match.group(0))
+            return json.loads(response)
         except json.JSONDecodeError as e:
             raise ValueError(f"Failed to parse model response as JSON: {e}")
     
+    def _prepare_inputs(self, exercise_text: str, domain: str) -> Dict[str, Any]:
+        """Build the generate() inputs for an exercise, reusing the cached template prefix.
+        
+        Args:
+            exercise_text: The exercise description
+            domain: The science domain
+            
+        Returns:
+            Keyword arguments for model.generate()
+        """
+        import torch
+        
+        prefix, suffix = self._get_template(domain)
+        
+        if suffix is not None:
+            # Only the exercise text and the instructions after it need a prefill;
+            # generate() skips the input positions already held in the cache
+            prefix_ids, prefix_cache = self._get_prefix_cache(domain, prefix)
+            tail_ids = self._to_device(self.tokenizer(
+                exercise_text + suffix,
+                add_special_tokens=False,
+                return_tensors="pt"
+            ))['input_ids']
+            input_ids = torch.cat([prefix_ids, tail_ids], dim=-1)
+            
+            if input_ids.shape[-1] + self.generation_config.max_new_tokens <= self.max_cache_len:
+                return {
+                    'input_ids': input_ids,
+                    'attention_mask': torch.ones_like(input_ids),
+                    # generate() extends the cache in place, so never hand it the shared copy
+                    'past_key_values': self._get_work_cache(prefix_cache),
+                    # An explicit cache replaces the static one configured at load time
+                    'cache_implementation': None,
+                }
+        
+        # No placeholder, or the exercise is too long for the cached prefix
+        prompt = self._template_fns[domain](exercise_text)
+        return self._to_device(self.tokenizer(prompt, return_tensors="pt"))
+    
+    def _to_device(self, tensors: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy tokenizer outputs to the model device.
+        
+        On CUDA, inputs are staged through reusable pinned host buffers so the
+        copies are asynchronous and no pageable bounce buffer is needed.
+        
+        Args:
+            tensors: Mapping of names to CPU tensors (e.g. a tokenizer BatchEncoding)
+            
+        Returns:
+            Mapping of the same names to tensors on the model device
+        """
+        if self.device != 'cuda':
+            return {name: tensor.to(self.device) for name, tensor in tensors.items()}
+        
+        import torch
+        
+        on_device = {}
+        for name, tensor in tensors.items():
+            if tensor.numel() > self.max_cache_len:
+                # Larger than the staging buffers (e.g. batched prompts)
+                on_device[name] = tensor.pin_memory().to(self.device, non_blocking=True)
+                continue
+            
+            key = (name, tensor.dtype)
+            if key not in self._pinned_buffers:
+                self._pinned_buffers[key] = torch.empty(self.max_cache_len, dtype=tensor.dtype).pin_memory()
+            # Don't overwrite the buffer while a previous copy may still be reading it
+            if key in self._pinned_events:
+                self._pinned_events[key].synchronize()
+            
+            staged = self._pinned_buffers[key][:tensor.numel()].view(tensor.shape)
+            staged.copy_(tensor)
+            on_device[name] = staged.to(self.device, non_blocking=True)
+            
+            event = torch.cuda.Event()
+            event.record()
+            self._pinned_events[key] = event
+        return on_device
+    
+    def _get_template(self, domain: str) -> Tuple[str, Optional[str]]:
+        """Load and pre-split the prompt template for a domain, reading the file only once.
+        
+        The template is formatted once around the {exercise_text} placeholder, and a
+        prompt builder that only concatenates strings is stored in self._template_fns.
+        
+        Args:
+            domain: The science domain
+            
+        Returns:
+            Tuple of (text before the exercise, text after it). The second item is
+            None if the template has no {exercise_text} placeholder.
+        """
+        if domain not in self._templates:
+            template_path = self.template_dir / self.default_templates.get(domain, 'physics_template.txt')
+            with open(template_path, 'r') as f:
+                template = f.read()
+            
+            prefix, placeholder, suffix = template.partition('{exercise_text}')
+            if placeholder:
+                prefix, suffix = prefix.format(), suffix.format()
+                self._template_fns[domain] = lambda exercise_text: prefix + exercise_text + suffix
+                self._templates[domain] = (prefix, suffix)
+            else:
+                static_prompt = template.format()
+                self._template_fns[domain] = lambda exercise_text: static_prompt
+                self._templates[domain] = (static_prompt, None)
+        return self._templates[domain]
+    
+    def _get_prefix_cache(self, domain: str, prefix: str) -> Tuple['torch.Tensor', 'Cache']:
+        """Prefill the static template prefix once and cache its key/value states.
+        
+        Args:
+            domain: The science domain the prefix belongs to
+            prefix: Template text preceding the exercise placeholder
+            
+        Returns:
+            Tuple of (prefix input ids, past key values)
+        """
+        if domain not in self._prefix_cache:
+            import torch
+            from transformers import StaticCache
+            
+            prefix_inputs = self._to_device(self.tokenizer(prefix, return_tensors="pt"))
+            cache = StaticCache(
+                config=self.model.config,
+                max_batch_size=1,
+                max_cache_len=self.max_cache_len,
+                device=self.model.device,
+                dtype=self.model.dtype
+            )
+            with torch.inference_mode():
+                outputs = self.model(**prefix_inputs, past_key_values=cache, use_cache=True)
+            self._prefix_cache[domain] = (prefix_inputs['input_ids'], outputs.past_key_values)
+        return self._prefix_cache[domain]
+    
+    def _get_work_cache(self, prefix_cache: 'Cache') -> 'Cache':
+        """Load a domain's prefix key/value states into the working cache.
+        
+        The working cache is allocated once, as a copy of the first prefix cache.
+        After that, the prefix states are copied into its existing tensors. Copying
+        the whole snapshot also clears anything the last generation wrote after the
+        prefix, and stays correct for sliding-window layers.
+        
+        Args:
+            prefix_cache: The prefilled prefix cache for the domain
+            
+        Returns:
+            The working cache, holding only the prefix states
+        """
+        if self._work_cache is None:
+            self._work_cache = copy.deepcopy(prefix_cache)
+            return self._work_cache
+        
+        import torch
+        
+        work = self._work_cache
+        with torch.inference_mode():
+            layers = getattr(prefix_cache, 'layers', None)
+            if layers is None:
+                # Older transformers keep per-layer tensors in key_cache/value_cache lists
+                for dst, src in zip(work.key_cache, prefix_cache.key_cache):
+                    dst.copy_(src)
+                for dst, src in zip(work.value_cache, prefix_cache.value_cache):
+                    dst.copy_(src)
+            else:
+                for dst, src in zip(work.layers, layers):
+                    dst.keys.copy_(src.keys)
+                    dst.values.copy_(src.values)
+                    if hasattr(src, 'cumulative_length'):
+                        dst.cumulative_length = src.cumulative_length
+        return work
+    
     def get_supported_domains(self) -> List[str]:
         """Get the list of supported science domains.
         
@@ -196,6 +759,11 @@ Response:"""
         
         # Update the default templates
         self.default_templates[domain] = dest_path.name
+        
+        # Drop any cached copy of the previous template
+        self._templates.pop(domain, None)
+        self._template_fns.pop(domain, None)
+        self._prefix_cache.pop(domain, None)
 
 
 def test_gemma_integration():
@@ -0,0 +1,36 @@
+"""
+Simulation Parameter Schemas
+
+This module defines the structure of the simulation parameters produced by
+Gemma 3N. The models mirror the JSON format requested in the prompt templates
+and are used to constrain decoding so the model can only emit valid output.
+"""
+from typing import Dict, List, Literal, Optional
+from pydantic import BaseModel
+
+
+class ValueUnit(BaseModel):
+    """A numeric quantity together with its unit."""
+    value: float
+    unit: str
+
+
+class Position(BaseModel):
+    """A 2D position in simulation coordinates."""
+    x: float
+    y: float
+
+
+class ObjectSpec(BaseModel):
+    """A physical object to place in the simulation."""
+    type: Literal['circle', 'box']
+    name: str
+    radius: Optional[float] = None
+    initial_position: Optional[Position] = None
+
+
+class SimulationSpec(BaseModel):
+    """Complete set of simulation parameters for an exercise."""
+    simulation_type: str
+    parameters: Dict[str, ValueUnit]
+    objects: List[ObjectSpec]
@@ -1,11 +1,58 @@
 """
 Main application module for the Science Simulation Lab Agent.
 """
+import json
+import re
+from typing import List
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QSplitter,
     QLabel, QPushButton, QTextEdit, QDockWidget
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QThread, pyqtSignal
+from PyQt6.QtGui import QTextCursor
+
+from .ai.gemma_integration import Gemma3NIntegration
+
+# Exercises in the description box are separated by a line of dashes
+EXERCISE_SEPARATOR = re.compile(r'^\s*-{3,}\s*$', re.MULTILINE)
+
+
+class GenerationWorker(QThread):
+    """Runs Gemma parameter generation off the UI thread."""
+    
+    token_received = pyqtSignal(str)
+    generation_finished = pyqtSignal(list)
+    generation_failed = pyqtSignal(str)
+    
+    def __init__(self, gemma: Gemma3NIntegration, exercises: List[str], parent=None):
+        """Initialize the worker.
+        
+        Args:
+            gemma: The Gemma integration to generate with
+            exercises: One or more exercise descriptions
+            parent: Optional parent QObject
+        """
+        super().__init__(parent)
+        self.gemma = gemma
+        self.exercises = exercises
+    
+    def run(self):
+        """Generate parameters, streaming decoded text for a single exercise."""
+        try:
+            if len(self.exercises) == 1:
+                params = self.gemma.generate_simulation_parameters_streaming(
+                    self.exercises[0],
+                    on_token=self.token_received.emit
+                )
+                self.generation_finished.emit([params])
+            else:
+                # Several exercises share one batched forward pass
+                self.generation_finished.emit(
+                    self.gemma.generate_simulation_parameters_batch(self.exercises)
+                )
+        except Exception as e:
+            self.generation_failed.emit(str(e))
+
 
 class ScienceSimulatorApp(QMainWindow):
     """Main application window for the Science Simulation Lab."""
@@ -31,6 +78,11 @@ class ScienceSimulatorApp(QMainWindow):
         
         # Set initial splitter sizes
         self.splitter.setSizes([800, 400])
+        
+        # Gemma is only loaded when the first simulation is generated
+        self.gemma = Gemma3NIntegration()
+        self.generation_worker = None
+        self.run_button.clicked.connect(self._on_run_clicked)
     
     def _create_simulation_panel(self):
         """Create the simulation display panel."""
@@ -91,3 +143,45 @@ class ScienceSimulatorApp(QMainWindow):
         layout.addStretch()
         
         self.splitter.addWidget(self.control_widget)
+    
+    def _on_run_clicked(self):
+        """Generate simulation parameters for the current exercises in the background."""
+        exercises = [
+            text.strip()
+            for text in EXERCISE_SEPARATOR.split(self.exercise_description.toPlainText())
+            if text.strip()
+        ]
+        if not exercises or self.generation_worker is not None:
+            return
+        
+        self.feedback_display.clear()
+        self.run_button.setEnabled(False)
+        
+        self.generation_worker = GenerationWorker(self.gemma, exercises, self)
+        self.generation_worker.token_received.connect(self._on_token_received)
+        self.generation_worker.generation_finished.connect(self._on_generation_finished)
+        self.generation_worker.generation_failed.connect(self._on_generation_failed)
+        self.generation_worker.finished.connect(self._on_worker_done)
+        self.generation_worker.start()
+    
+    def _on_token_received(self, text: str):
+        """Append streamed model output to the feedback display."""
+        self.feedback_display.moveCursor(QTextCursor.MoveOperation.End)
+        self.feedback_display.insertPlainText(text)
+    
+    def _on_generation_finished(self, results: list):
+        """Show the parsed simulation parameters for each exercise."""
+        self.feedback_display.setPlainText("\n\n".join(
+            json.dumps(params, indent=2) if params is not None else "Could not parse model output"
+            for params in results
+        ))
+    
+    def _on_generation_failed(self, message: str):
+        """Report a failed generation."""
+        self.feedback_display.append(f"\nError: {message}")
+    
+    def _on_worker_done(self):
+        """Re-enable the run button once the worker thread has exited."""
+        self.generation_worker.deleteLater()
+        self.generation_worker = None
+        self.run_button.setEnabled(True)
@@ -3,21 +3,91 @@ Core simulation engine for the Science Simulation Lab.
 Handles physics simulation and rendering of 2D simulations.
 """
 import pymunk
-import pymunk.pygame_util
 import pygame
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterable, List, Optional, Tuple
 import numpy as np
 
+from ..utils.jit import njit
+
+
+@njit(fastmath=True, cache=True)
+def integrate_kinematics(positions, velocities, gravity_x, gravity_y, dt):
+    """Advance free-flying bodies by one velocity-Verlet step under constant gravity."""
+    half_dt2 = 0.5 * dt * dt
+    for i in range(positions.shape[0]):
+        positions[i, 0] += velocities[i, 0] * dt + gravity_x * half_dt2
+        positions[i, 1] += velocities[i, 1] * dt + gravity_y * half_dt2
+        velocities[i, 0] += gravity_x * dt
+        velocities[i, 1] += gravity_y * dt
+
+
+class SimulationObject:
+    """Lightweight view of one object stored in the engine's arrays."""
+    
+    __slots__ = ('engine', 'index')
+    
+    def __init__(self, engine: 'SimulationEngine', index: int):
+        """Initialize the view.
+        
+        Args:
+            engine: The engine holding the object
+            index: Row of the object in the engine's arrays
+        """
+        self.engine = engine
+        self.index = index
+    
+    @property
+    def name(self) -> str:
+        return self.engine.names[self.index]
+    
+    @property
+    def type(self) -> str:
+        return self.engine.types[self.index]
+    
+    @property
+    def shape(self) -> pymunk.Shape:
+        return self.engine.shapes[self.index]
+    
+    @property
+    def body(self) -> pymunk.Body:
+        return self.engine.shapes[self.index].body
+    
+    @property
+    def mass(self) -> float:
+        return float(self.engine.mass[self.index])
+    
+    @property
+    def radius(self) -> float:
+        return float(self.engine.radius[self.index])
+    
+    @property
+    def position(self) -> np.ndarray:
+        self.engine._sync_arrays()
+        return self.engine.pos[self.index]
+    
+    @property
+    def velocity(self) -> np.ndarray:
+        self.engine._sync_arrays()
+        return self.engine.vel[self.index]
+
+
 class SimulationEngine:
     """Core engine for running physics simulations."""
     
-    def __init__(self, width: int = 800, height: int = 600, control_panel_width: int = 300):
+    # Fonts shared by all engines, created on first use
+    _FONT = None
+    _TITLE_FONT = None
+    
+    def __init__(self, width: int = 800, height: int = 600, control_panel_width: int = 300,
+                 kinematic_only: bool = False):
         """Initialize the simulation engine.
         
         Args:
             width: Width of the simulation area in pixels
             height: Height of the simulation area in pixels
             control_panel_width: Width of the control panel area
+            kinematic_only: Integrate bodies directly, without collisions, when the
+                space only holds circles added through add_object
         """
         # Physics space
         self.space = pymunk.Space()
@@ -32,24 +102,70 @@ class SimulationEngine:
         self.surface = None
         self.simulation_surface = None  # Surface for just the simulation
         self.control_panel = None
-        self.draw_options = None
         
-        # Simulation objects
-        self.objects = {}
+        # Shapes grouped by kind for drawing, rebuilt when the space changes
+        self._circles: List[pymunk.Circle] = []
+        self._segments: List[pymunk.Segment] = []
+        self._polys: List[pymunk.Poly] = []
+        self._draw_shape_count = -1
+        self._draw_stale = True
+        
+        # Simulation objects as parallel arrays, one row per object
+        self.names: List[str] = []
+        self.types: List[str] = []
+        self.shapes: List[pymunk.Shape] = []
+        self.pos = np.zeros((0, 2), dtype=np.float32)
+        self.vel = np.zeros((0, 2), dtype=np.float32)
+        self.mass = np.zeros(0, dtype=np.float32)
+        self.radius = np.zeros(0, dtype=np.float32)
+        self.objects_index: Dict[str, int] = {}
         self.parameters = {}
         
+        # Which side holds the current state: the arrays (kinematic mode) or pymunk
+        self.kinematic_only = kinematic_only
+        self._only_circles = True
+        self._bodies_stale = False
+        self._arrays_stale = False
+        
         # Time tracking and control
+        self._fixed_dt = 1 / 120.0
+        self._accumulator = 0.0
         self.clock = pygame.time.Clock()
         self.running = False
         self.paused = False
         
-        # Initialize pygame if not already done
-        if not pygame.get_init():
+        # Initialize pygame if not already done, and remember whether we own it
+        self._owns_pygame = not pygame.get_init()
+        if self._owns_pygame:
             pygame.init()
             
         # Set up fonts
-        self.font = pygame.font.SysFont('Arial', 14)
-        self.title_font = pygame.font.SysFont('Arial', 18, bold=True)
+        self.font, self.title_font = self._get_fonts()
+    
+    @classmethod
+    def _get_fonts(cls) -> Tuple[pygame.font.Font, pygame.font.Font]:
+        """Return the shared body and title fonts, creating them on first use.
+        
+        Returns:
+            Tuple of (font, title_font)
+        """
+        if not pygame.font.get_init():
+            # Fonts from a previous pygame session are no longer valid
+            pygame.font.init()
+            cls._FONT = None
+        
+        if cls._FONT is None:
+            cls._FONT = pygame.font.SysFont('Arial', 14)
+            cls._TITLE_FONT = pygame.font.SysFont('Arial', 18, bold=True)
+            # Drop them on pygame.quit(), even when someone else shuts pygame down
+            pygame.register_quit(cls._clear_fonts)
+        return cls._FONT, cls._TITLE_FONT
+    
+    @classmethod
+    def _clear_fonts(cls):
+        """Forget the shared fonts; they don't survive pygame.quit()."""
+        cls._FONT = None
+        cls._TITLE_FONT = None
     
     def setup_render_surface(self, surface=None):
         """Set up the pygame surface for rendering.
@@ -64,7 +180,10 @@ class SimulationEngine:
             
             # Create a window with space for controls
             total_width = self.width + self.control_panel_width
-            self.surface = pygame.display.set_mode((total_width, self.height))
+            # Opaque, double-buffered display; nothing on the main window needs per-pixel alpha
+            self.surface = pygame.display.set_mode(
+                (total_width, self.height), pygame.HWSURFACE | pygame.DOUBLEBUF
+            )
             pygame.display.set_caption("Science Simulation Lab")
             
             # Create a subsurface for the simulation
@@ -72,9 +191,6 @@ class SimulationEngine:
                 pygame.Rect(0, 0, self.width, self.height)
             )
             
-            # Set up the drawing options for the simulation surface
-            self.draw_options = pymunk.pygame_util.DrawOptions(self.simulation_surface)
-            
             # Initialize the control panel
             self._init_control_panel()
         else:
@@ -82,11 +198,12 @@ class SimulationEngine:
             self.simulation_surface = surface.subsurface(
                 pygame.Rect(0, 0, self.width, self.height)
             )
-            self.draw_options = pymunk.pygame_util.DrawOptions(self.simulation_surface)
         
         # Set the background colors
         self.surface.fill((230, 230, 240))  # Light gray for control panel
         self.simulation_surface.fill((255, 255, 255))  # White for simulation
+        if self.control_panel:
+            self.control_panel.invalidate()
         pygame.display.flip()
     
     def add_object(self, name: str, obj_type: str, **kwargs) -> pymunk.Shape:
@@ -100,6 +217,66 @@ class SimulationEngine:
         Returns:
             The created physics shape
         """
+        return self.add_objects([(name, obj_type, kwargs)])[0]
+    
+    def add_objects(self, specs: Iterable[Tuple[str, str, Dict[str, Any]]],
+                    extra: Iterable[Any] = ()) -> List[pymunk.Shape]:
+        """Add several physics objects with a single call into pymunk.
+        
+        Args:
+            specs: (name, obj_type, kwargs) for each object, as for add_object
+            extra: Additional bodies, shapes or constraints to add to the space
+                in the same call (e.g. static ground segments)
+            
+        Returns:
+            The created physics shapes, in order
+        """
+        specs = list(specs)
+        shapes = [self._create_shape(obj_type, **kwargs) for _, obj_type, kwargs in specs]
+        bodies = [shape.body for shape in shapes]
+        
+        # Add to space
+        self.space.add(*bodies, *shapes, *extra)
+        self.invalidate_shapes()
+        
+        if not shapes:
+            return shapes
+        
+        # Store the objects as new rows in the arrays
+        self._sync_arrays()
+        start = len(self.names)
+        for offset, (name, obj_type, _) in enumerate(specs):
+            self.objects_index[name] = start + offset
+            self.names.append(name)
+            self.types.append(obj_type)
+            self._only_circles = self._only_circles and obj_type == 'circle'
+        self.shapes.extend(shapes)
+        self.pos = np.concatenate(
+            [self.pos, np.array([tuple(body.position) for body in bodies], dtype=np.float32)]
+        )
+        self.vel = np.concatenate(
+            [self.vel, np.array([tuple(body.velocity) for body in bodies], dtype=np.float32)]
+        )
+        self.mass = np.concatenate(
+            [self.mass, np.array([body.mass for body in bodies], dtype=np.float32)]
+        )
+        self.radius = np.concatenate(
+            [self.radius, np.array([getattr(shape, 'radius', 0.0) for shape in shapes],
+                                   dtype=np.float32)]
+        )
+        
+        return shapes
+    
+    def _create_shape(self, obj_type: str, **kwargs) -> pymunk.Shape:
+        """Create the body and shape for an object without adding them to the space.
+        
+        Args:
+            obj_type: Type of object ('box', 'circle')
+            **kwargs: Additional parameters for the object
+            
+        Returns:
+            The created physics shape, attached to its body
+        """
         # Create the appropriate shape based on type
         if obj_type == 'box':
             width = kwargs.get('width', 50)
@@ -131,19 +308,22 @@ class SimulationEngine:
         shape.elasticity = kwargs.get('elasticity', 0.5)
         shape.friction = kwargs.get('friction', 0.7)
         
-        # Add to space
-        self.space.add(body, shape)
-        
-        # Store the object
-        self.objects[name] = {
-            'body': body,
-            'shape': shape,
-            'type': obj_type,
-            'properties': kwargs
-        }
-        
         return shape
     
+    def get_object(self, name: str) -> SimulationObject:
+        """Get a view of an object added with add_object.
+        
+        Args:
+            name: Name of the object
+            
+        Returns:
+            A SimulationObject backed by the engine's arrays
+            
+        Raises:
+            KeyError: If no object with that name exists
+        """
+        return SimulationObject(self, self.objects_index[name])
+    
     def add_parameter(self, name: str, param_type: str, **kwargs):
         """Add a configurable parameter to the simulation.
         
@@ -177,13 +357,113 @@ class SimulationEngine:
             if callable(param.get('on_change')):
                 param['on_change'](value)
     
+    def set_velocity(self, name: str, velocity: Tuple[float, float]):
+        """Set the velocity of an object added with add_object.
+        
+        Args:
+            name: Name of the object
+            velocity: New (vx, vy) velocity in pixels/s
+        """
+        index = self.objects_index[name]
+        self._sync_arrays()
+        self.shapes[index].body.velocity = velocity
+        self.vel[index] = velocity
+    
     def step(self, dt: float = 1/60.0):
-        """Advance the simulation by one time step.
+        """Advance the simulation by dt seconds using fixed-size substeps.
+        
+        Elapsed time is accumulated and consumed in steps of the fixed timestep,
+        so results don't depend on the frame rate. Any remainder carries over
+        to the next call.
         
         Args:
+            dt: Elapsed time in seconds
+        """
+        self._accumulator += dt
+        fixed_dt = self._fixed_dt
+        
+        if self._use_kinematics():
+            self._sync_arrays()
+            while self._accumulator >= fixed_dt:
+                self._numba_step(self.pos, self.vel, self.space.gravity, fixed_dt)
+                self._accumulator -= fixed_dt
+            self._bodies_stale = True
+        else:
+            if self._bodies_stale:
+                self._sync_bodies()
+            while self._accumulator >= fixed_dt:
+                self.space.step(fixed_dt)
+                self._accumulator -= fixed_dt
+            self._arrays_stale = True
+    
+    def set_fixed_dt(self, fixed_dt: float):
+        """Set the size of the physics substep.
+        
+        Args:
+            fixed_dt: Substep length in seconds
+        """
+        if fixed_dt <= 0:
+            raise ValueError(f"Fixed timestep must be positive, got {fixed_dt}")
+        self._fixed_dt = fixed_dt
+    
+    def _use_kinematics(self) -> bool:
+        """Check whether the kinematic integrator can replace the pymunk step."""
+        return (
+            self.kinematic_only
+            and self._only_circles
+            and len(self.shapes) > 0
+            and len(self.space.shapes) == len(self.shapes)
+        )
+    
+    @staticmethod
+    def _numba_step(positions: np.ndarray, velocities: np.ndarray, gravity, dt: float):
+        """Integrate positions and velocities in place with the compiled kernel.
+        
+        Args:
+            positions: (N, 2) array of positions
+            velocities: (N, 2) array of velocities
+            gravity: (gx, gy) gravity vector
             dt: Time step in seconds
         """
-        self.space.step(dt)
+        integrate_kinematics(positions, velocities, float(gravity[0]), float(gravity[1]), dt)
+    
+    def _sync_bodies(self):
+        """Copy kinematic positions and velocities back into the pymunk bodies."""
+        for shape, pos, vel in zip(self.shapes, self.pos.tolist(), self.vel.tolist()):
+            shape.body.position = pos
+            shape.body.velocity = vel
+        self._bodies_stale = False
+    
+    def _sync_arrays(self):
+        """Refresh the position and velocity arrays after pymunk has stepped."""
+        if self._arrays_stale:
+            for i, shape in enumerate(self.shapes):
+                self.pos[i] = tuple(shape.body.position)
+                self.vel[i] = tuple(shape.body.velocity)
+            self._arrays_stale = False
+    
+    def compute_trajectory(self, x0: float, y0: float, vx: float, vy: float,
+                           g: float, dt: float, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Compute a projectile trajectory in closed form.
+        
+        Evaluates x(t) = x0 + vx*t and y(t) = y0 + vy*t + g*t²/2 for n frames
+        in one vectorized pass instead of stepping the physics space. Only valid
+        while nothing collides with the projectile.
+        
+        Args:
+            x0, y0: Initial position in pixels
+            vx, vy: Initial velocity in pixels/s
+            g: Vertical gravity in pixels/s² (positive is down)
+            dt: Time between frames in seconds
+            n: Number of frames to compute
+            
+        Returns:
+            Tuple of (xs, ys) position arrays of length n
+        """
+        t = np.arange(n) * dt
+        xs = x0 + vx * t
+        ys = y0 + vy * t + 0.5 * g * t * t
+        return xs, ys
     
     def _init_control_panel(self):
         """Initialize the control panel with default controls."""
@@ -230,12 +510,16 @@ class SimulationEngine:
         """Render the current simulation state."""
         if not self.surface or not self.simulation_surface:
             return
+        
+        # Bodies only need the integrated state when they are drawn
+        if self._bodies_stale:
+            self._sync_bodies()
             
         # Clear the surfaces
         self.simulation_surface.fill((255, 255, 255))
         
         # Draw the simulation
-        self.space.debug_draw(self.draw_options)
+        self._fast_draw()
         
         # Draw FPS counter
         fps_text = self.font.render(f"FPS: {int(self.clock.get_fps())}", True, (0, 0, 0))
@@ -248,6 +532,55 @@ class SimulationEngine:
         # Update the display
         pygame.display.flip()
     
+    def invalidate_shapes(self):
+        """Mark the drawing groups as stale after shapes were added to or removed from the space.
+        
+        add_objects and reset call this themselves; call it after modifying
+        space.shapes directly.
+        """
+        self._draw_stale = True
+    
+    def _partition_shapes(self):
+        """Group the shapes in the space by kind so drawing needs no type dispatch."""
+        shapes = self.space.shapes
+        # The count check only catches direct space changes that skipped invalidate_shapes()
+        if not self._draw_stale and len(shapes) == self._draw_shape_count:
+            return
+        
+        self._circles = [s for s in shapes if isinstance(s, pymunk.Circle)]
+        self._segments = [s for s in shapes if isinstance(s, pymunk.Segment)]
+        self._polys = [s for s in shapes if isinstance(s, pymunk.Poly)]
+        self._draw_shape_count = len(shapes)
+        self._draw_stale = False
+    
+    def _fast_draw(self):
+        """Draw all shapes directly with pygame instead of pymunk's debug draw."""
+        self._partition_shapes()
+        surface = self.simulation_surface
+        default_color = (70, 130, 180)
+        static_color = (100, 100, 100)
+        
+        for shape in self._circles:
+            body = shape.body
+            pos = body.position
+            color = getattr(shape, 'color', default_color)[:3]
+            pygame.draw.circle(surface, color, (int(pos.x), int(pos.y)), int(shape.radius))
+        
+        for shape in self._segments:
+            body = shape.body
+            a = body.local_to_world(shape.a)
+            b = body.local_to_world(shape.b)
+            color = getattr(shape, 'color', static_color)[:3]
+            width = max(1, int(shape.radius * 2))
+            pygame.draw.line(surface, color, (int(a.x), int(a.y)), (int(b.x), int(b.y)), width)
+        
+        for shape in self._polys:
+            body = shape.body
+            points = [(int(v.x), int(v.y)) for v in
+                      (body.local_to_world(v) for v in shape.get_vertices())]
+            color = getattr(shape, 'color', default_color)[:3]
+            pygame.draw.polygon(surface, color, points)
+    
     def run(self, max_fps: int = 60):
         """Run the simulation loop.
         
@@ -285,15 +618,34 @@ class SimulationEngine:
         for constraint in list(self.space.constraints):
             self.space.remove(constraint)
         
-        # Clear object references
-        self.objects = {}
+        # Truncate the object arrays
+        self.names = []
+        self.types = []
+        self.shapes = []
+        self.pos = self.pos[:0]
+        self.vel = self.vel[:0]
+        self.mass = self.mass[:0]
+        self.radius = self.radius[:0]
+        self.objects_index = {}
+        self._only_circles = True
+        self._bodies_stale = False
+        self._arrays_stale = False
+        self.invalidate_shapes()
+        self._accumulator = 0.0
         
         # Reset parameters to defaults
         for param in self.parameters.values():
             if 'default' in param:
                 param['value'] = param['default']
     
-    def __del__(self):
-        """Clean up resources."""
-        if pygame.get_init():
+    def close(self):
+        """Shut down pygame if this engine initialized it."""
+        if self._owns_pygame and pygame.get_init():
             pygame.quit()
+        self._owns_pygame = False
+    
+    def __enter__(self) -> 'SimulationEngine':
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
@@ -5,17 +5,211 @@ Coordinates between the UI, parser, and simulation engine to manage
 the lifecycle of science simulations.
 """
 import os
+import copy
+import datetime
+import functools
 import json
-import yaml
+import hashlib
+import numbers
+import stat
+from concurrent.futures import Future, ThreadPoolExecutor
+from collections import OrderedDict, defaultdict, deque
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Callable
-import pymunk
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Callable, Hashable, Tuple
+import numpy as np
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# The engine (pymunk, pygame) and Numba are imported where they are used, so
+# importing this module stays cheap
+if TYPE_CHECKING:
+    from .simulation_engine import SimulationEngine
+    from ..parsers.exercise_parser import ExerciseParser
+
+def _json_loads(data: bytes) -> Any:
+    """Decode JSON bytes, using orjson when available."""
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(obj: Any, indent: bool = False) -> bytes:
+    """Encode an object as UTF-8 JSON bytes, using orjson when available.
+    
+    Args:
+        obj: Object to encode
+        indent: Whether to pretty-print with two-space indentation
+        
+    Returns:
+        The encoded JSON
+    """
+    if orjson:
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    return json.dumps(obj, indent=2 if indent else None).encode('utf-8')
+
+
+# Parsed exercises shared across managers, most recently used last.
+# Files are keyed by path and validated against their (mtime, size);
+# parsed text (direct input or text files) is keyed by a digest of its content,
+# so identical text is only sent to the parser once.
+_EXERCISE_CACHE: 'OrderedDict[Hashable, Tuple[Optional[Tuple[float, int]], Dict[str, Any]]]' = OrderedDict()
+_EXERCISE_CACHE_SIZE = 100
+
+# Object config keys that add_objects receives separately rather than as kwargs
+_SKIP = frozenset({'type', 'name', 'position'})
+
+def _stat_file(path: str) -> Optional[os.stat_result]:
+    """Stat a path that may be an exercise file.
+    
+    A single os.stat both decides whether the source is a file and provides
+    the (mtime, size) stamp for the exercise cache.
+    
+    Args:
+        path: Candidate file path (or exercise text)
+        
+    Returns:
+        The stat result if the path is an existing regular file, otherwise None
+    """
+    try:
+        st = os.stat(path)
+    except (OSError, ValueError):
+        # Not a path at all (e.g. text with NUL bytes or too long) or missing
+        return None
+    return st if stat.S_ISREG(st.st_mode) else None
+
+
+def _cache_get(key: Hashable, stamp: Optional[Tuple[float, int]]) -> Optional[Dict[str, Any]]:
+    """Look up a parsed exercise in the cache.
+    
+    Args:
+        key: Cache key for the exercise source
+        stamp: (mtime, size) the cached entry must match, or None for text input
+        
+    Returns:
+        A deep copy of the cached exercise, or None on a miss
+    """
+    entry = _EXERCISE_CACHE.get(key)
+    if entry is None or entry[0] != stamp:
+        return None
+    _EXERCISE_CACHE.move_to_end(key)
+    # Callers mutate the exercise, so never hand out the cached instance
+    return copy.deepcopy(entry[1])
+
+
+def _cache_put(key: Hashable, stamp: Optional[Tuple[float, int]], exercise: Dict[str, Any]):
+    """Store a parsed exercise in the cache, evicting the least recently used entry.
+    
+    Args:
+        key: Cache key for the exercise source
+        stamp: (mtime, size) of the source file, or None for text input
+        exercise: Parsed exercise data
+    """
+    _EXERCISE_CACHE[key] = (stamp, copy.deepcopy(exercise))
+    _EXERCISE_CACHE.move_to_end(key)
+    if len(_EXERCISE_CACHE) > _EXERCISE_CACHE_SIZE:
+        _EXERCISE_CACHE.popitem(last=False)
+
+
+def _check_numeric(user: np.ndarray, expected: np.ndarray, tolerance: np.ndarray) -> np.ndarray:
+    """Compare user answers against expected values within per-target tolerances.
+    
+    Args:
+        user: User-provided values (NaN where there is no usable answer)
+        expected: Expected values
+        tolerance: Allowed absolute error for each value
+        
+    Returns:
+        Boolean array, True where the answer is within tolerance
+    """
+    return np.abs(user - expected) <= tolerance
+
+
+@functools.lru_cache(maxsize=1)
+def _compiled_check_numeric() -> Callable[[np.ndarray, np.ndarray, np.ndarray], np.ndarray]:
+    """Get _check_numeric compiled with Numba, importing it on first use.
+    
+    Returns:
+        The compiled function, or _check_numeric itself when Numba is not installed
+    """
+    from ..utils.jit import njit
+    
+    # No fastmath here: it assumes no NaNs, and a NaN answer must compare as wrong
+    return njit(cache=True)(_check_numeric)
+
+
+def _warmup():
+    """Run each compiled kernel once with small arrays of the dtypes used at runtime.
+    
+    The first call compiles the kernel, or loads it from Numba's on-disk cache,
+    so doing it up front keeps that cost out of the first simulation step or
+    answer check. Does nothing without Numba, or when SCIENCE_SIM_WARMUP is not '1'.
+    """
+    from ..utils.jit import NUMBA_AVAILABLE
+    from .simulation_engine import integrate_kinematics
+    
+    if not NUMBA_AVAILABLE or os.environ.get('SCIENCE_SIM_WARMUP', '1') != '1':
+        return
+    
+    values = np.zeros(4, dtype=np.float64)
+    _compiled_check_numeric()(values, values, values)
+    
+    positions = np.zeros((4, 2), dtype=np.float32)
+    velocities = np.zeros((4, 2), dtype=np.float32)
+    integrate_kinematics(positions, velocities, 0.0, 900.0, 1 / 120.0)
+
+
+def _is_real(value: Any) -> bool:
+    """Check whether a parameter value can be stored in the float array unchanged."""
+    return isinstance(value, numbers.Real) and not isinstance(value, bool)
+
+
+def _make_parameter_setter(name: str, engine_param: Dict[str, Any], values: np.ndarray,
+                           other_values: Dict[int, Any], index: int,
+                           notify: Callable) -> Callable[[Any], None]:
+    """Build the update function for one simulation parameter.
+    
+    Equivalent to SimulationManager.update_parameter for that parameter, with
+    the engine's parameter dict and the manager's value slot bound up front.
+    
+    Args:
+        name: Name of the parameter
+        engine_param: The engine's entry for the parameter
+        values: The manager's parameter value array
+        other_values: The manager's non-numeric parameter values, by index
+        index: Position of this parameter in values
+        notify: The manager's _notify method
+        
+    Returns:
+        A function taking the new value
+    """
+    def set_value(value: Any):
+        # Store the value first so a bad value can't leave the engine out of sync;
+        # only real numbers go in the array, anything else is kept as given
+        if _is_real(value):
+            values[index] = value
+            other_values.pop(index, None)
+        else:
+            other_values[index] = value
+        
+        engine_param['value'] = value
+        on_change = engine_param.get('on_change')
+        if callable(on_change):
+            on_change(value)
+        notify('on_parameter_change', name, value)
+    
+    return set_value
 
-from ..parsers.exercise_parser import ExerciseParser
-from .simulation_engine import SimulationEngine
-from typing import Optional, Dict, Any, List, Callable
-import os
-from pathlib import Path
 
 class SimulationManager:
     """Manages the lifecycle of science simulations.
@@ -24,6 +218,12 @@ class SimulationManager:
     and simulation engine to create an interactive learning experience.
     """
     
+    # Data directories already created in this process
+    _created_dirs: set = set()
+    
+    # Whether the compiled kernels were warmed up in this process
+    _warmed_up = False
+    
     def __init__(self, use_gemma: bool = True, gemma_model: str = "google/gemma-3n"):
         """Initialize the simulation manager.
         
@@ -31,26 +231,55 @@ class SimulationManager:
             use_gemma: Whether to use the Gemma 3N model for parsing
             gemma_model: Name or path of the Gemma 3N model to use
         """
-        # Initialize the exercise parser with Gemma 3N integration
-        self.parser = ExerciseParser(use_gemma=use_gemma, gemma_model=gemma_model)
+        # The exercise parser (with Gemma 3N integration) is created on first use
+        self.use_gemma = use_gemma
+        self.gemma_model = gemma_model
+        self._parser = None
+        
+        from .simulation_engine import SimulationEngine
         self.engine = SimulationEngine()
+        
+        # Compile the kernels with the first manager rather than on the first step
+        if not SimulationManager._warmed_up:
+            SimulationManager._warmed_up = True
+            _warmup()
         self.current_exercise = None
         self.current_simulation = None
-        self.callbacks = {
-            'on_parameter_change': [],
-            'on_simulation_update': [],
-            'on_feedback': [],
-            'on_parse_complete': [],
-            'on_error': []
+        self._param_setters: Dict[str, Callable[[Any], None]] = {}
+        self.callbacks: Dict[str, Tuple[Callable, ...]] = {
+            'on_parameter_change': (),
+            'on_simulation_update': (),
+            'on_feedback': (),
+            'on_parse_complete': (),
+            'on_error': ()
         }
         
         # Create necessary directories
         self.data_dir = Path.home() / '.science_simulator'
         self.exercises_dir = self.data_dir / 'exercises'
         self.results_dir = self.data_dir / 'results'
+        self.cache_dir = self.data_dir / 'cache'
+        
+        # Only once per data directory per process; the tree persists across instances
+        if self.data_dir not in SimulationManager._created_dirs:
+            for directory in [self.data_dir, self.exercises_dir, self.results_dir, self.cache_dir]:
+                directory.mkdir(exist_ok=True, parents=True)
+            SimulationManager._created_dirs.add(self.data_dir)
         
-        for directory in [self.data_dir, self.exercises_dir, self.results_dir]:
-            directory.mkdir(exist_ok=True, parents=True)
+        self._save_counter = 0
+        
+        # Result files are written in the background so saving doesn't block the UI.
+        # Write errors are queued there and reported from the caller's thread
+        self._io_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='results-io')
+        self._write_errors: deque = deque()
+    
+    @property
+    def parser(self) -> 'ExerciseParser':
+        """The exercise parser, imported and created on first access."""
+        if self._parser is None:
+            from ..parsers.exercise_parser import ExerciseParser
+            self._parser = ExerciseParser(use_gemma=self.use_gemma, gemma_model=self.gemma_model)
+        return self._parser
     
     def load_exercise(self, exercise_source: str, domain: str = None) -> Dict[str, Any]:
         """Load an exercise from a description or file.
@@ -65,42 +294,26 @@ class SimulationManager:
         Raises:
             ValueError: If the exercise cannot be loaded or parsed
         """
+        self._report_write_errors()
+        
         try:
             # Check if the source is a file path
-            if os.path.isfile(exercise_source):
-                with open(exercise_source, 'r', encoding='utf-8') as f:
-                    if exercise_source.endswith(('.yaml', '.yml')):
-                        # Load from YAML template
-                        self.current_exercise = yaml.safe_load(f)
-                        # Add metadata
-                        if not isinstance(self.current_exercise, dict):
-                            self.current_exercise = {'content': self.current_exercise}
-                        self.current_exercise['source'] = exercise_source
-                        self.current_exercise['parse_method'] = 'yaml_template'
-                    elif exercise_source.endswith('.json'):
-                        # Load from JSON template
-                        self.current_exercise = json.load(f)
-                        self.current_exercise['source'] = exercise_source
-                        self.current_exercise['parse_method'] = 'json_template'
-                    else:
-                        # Assume it's a text description
-                        exercise_text = f.read()
-                        self.current_exercise = self.parser.parse_exercise(
-                            exercise_text, 
-                            domain=domain
-                        )
-                        self.current_exercise['source'] = exercise_source
+            st = _stat_file(exercise_source)
+            if st is not None:
+                key = (exercise_source, domain)
+                stamp = (st.st_mtime, st.st_size)
+                self.current_exercise = _cache_get(key, stamp)
+                if self.current_exercise is None:
+                    self.current_exercise = self._read_exercise_file(exercise_source, domain)
+                    _cache_put(key, stamp, self.current_exercise)
             else:
                 # Treat as direct exercise text
-                self.current_exercise = self.parser.parse_exercise(
-                    exercise_source,
-                    domain=domain
-                )
+                self.current_exercise = self._parse_text(exercise_source, domain)
                 self.current_exercise['source'] = 'direct_input'
+                self._set_default_domain(self.current_exercise, domain)
             
-            # Add domain if not already set
-            if 'domain' not in self.current_exercise:
-                self.current_exercise['domain'] = domain or 'physics'
+            # Work out the object layout once for every later run
+            self.current_exercise['_objects_normalized'] = self._normalize_objects(self.current_exercise)
             
             # Initialize simulation based on exercise type
             self._initialize_simulation()
@@ -115,6 +328,207 @@ class SimulationManager:
             self._notify('on_error', error_msg)
             raise ValueError(error_msg) from e
     
+    def load_exercises(self, sources: List[str], domain: str = None) -> List[Dict[str, Any]]:
+        """Load several exercises, parsing all text descriptions together.
+        
+        YAML/JSON templates are read directly; text files and direct text are
+        collected and parsed in batched Gemma calls. Unlike load_exercise, this
+        does not change the current exercise.
+        
+        Args:
+            sources: Exercise texts and/or paths to files
+            domain: Optional domain hint ('physics', 'chemistry', 'biology')
+            
+        Returns:
+            One dictionary of exercise data per source, in order
+            
+        Raises:
+            ValueError: If any exercise cannot be loaded or parsed
+        """
+        self._report_write_errors()
+        
+        exercises: List[Optional[Dict[str, Any]]] = [None] * len(sources)
+        # (index, text, file cache key and stamp or None, source label) for each
+        # text that has not been parsed before
+        pending = []
+        
+        try:
+            for i, source in enumerate(sources):
+                file_entry = None
+                st = _stat_file(source)
+                if st is not None:
+                    file_entry = ((source, domain), (st.st_mtime, st.st_size))
+                    exercises[i] = _cache_get(*file_entry)
+                    if exercises[i] is not None:
+                        continue
+                    
+                    if source.endswith(('.yaml', '.yml', '.json')):
+                        exercises[i] = self._read_exercise_file(source, domain)
+                        _cache_put(*file_entry, exercises[i])
+                        continue
+                    
+                    with open(source, 'r', encoding='utf-8') as f:
+                        text = f.read()
+                    label = source
+                else:
+                    text = source
+                    label = 'direct_input'
+                
+                exercise = _cache_get(self._text_key(text, domain), None)
+                if exercise is None:
+                    pending.append((i, text, file_entry, label))
+                    continue
+                exercises[i] = self._finish_text_exercise(exercise, label, domain, file_entry)
+            
+            if pending:
+                parsed = self.parser.parse_exercise_batch(
+                    [text for _, text, _, _ in pending],
+                    domain=domain
+                )
+                for (i, text, file_entry, label), exercise in zip(pending, parsed):
+                    _cache_put(self._text_key(text, domain), None, exercise)
+                    exercises[i] = self._finish_text_exercise(exercise, label, domain, file_entry)
+                    
+        except Exception as e:
+            error_msg = f"Failed to load exercises: {str(e)}"
+            self._notify('on_error', error_msg)
+            raise ValueError(error_msg) from e
+        
+        return exercises
+    
+    @staticmethod
+    def _text_key(text: str, domain: str = None) -> Tuple[bytes, Optional[str]]:
+        """Cache key for parsed exercise text: a digest of the content plus the domain."""
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest(), domain
+    
+    def _parse_text(self, text: str, domain: str = None) -> Dict[str, Any]:
+        """Parse exercise text, reusing the result if the same text was parsed before.
+        
+        Args:
+            text: The exercise description text
+            domain: Optional domain hint ('physics', 'chemistry', 'biology')
+            
+        Returns:
+            Dictionary containing exercise data, safe for the caller to modify
+        """
+        key = self._text_key(text, domain)
+        exercise = _cache_get(key, None)
+        if exercise is None:
+            exercise = self.parser.parse_exercise(text, domain=domain)
+            _cache_put(key, None, exercise)
+        return exercise
+    
+    def _finish_text_exercise(self, exercise: Dict[str, Any], label: str, domain: str,
+                              file_entry: Optional[Tuple[Hashable, Tuple[float, int]]]) -> Dict[str, Any]:
+        """Add source metadata to a parsed text exercise and cache it by file if it came from one.
+        
+        Args:
+            exercise: The parsed exercise
+            label: Value for the 'source' field
+            domain: Optional domain hint
+            file_entry: (cache key, stamp) of the source file, or None for direct text
+            
+        Returns:
+            The completed exercise
+        """
+        exercise['source'] = label
+        self._set_default_domain(exercise, domain)
+        if file_entry is not None:
+            _cache_put(*file_entry, exercise)
+        return exercise
+    
+    def _read_exercise_file(self, path: str, domain: str = None) -> Dict[str, Any]:
+        """Read and parse an exercise file.
+        
+        Args:
+            path: Path to a YAML/JSON template or a text description
+            domain: Optional domain hint ('physics', 'chemistry', 'biology')
+            
+        Returns:
+            Dictionary containing exercise data
+        """
+        if path.endswith(('.yaml', '.yml')):
+            # Load from YAML template
+            exercise = self._load_yaml(path)
+            # Add metadata
+            if not isinstance(exercise, dict):
+                exercise = {'content': exercise}
+            exercise['source'] = path
+            exercise['parse_method'] = 'yaml_template'
+        elif path.endswith('.json'):
+            # Load from JSON template
+            exercise = _json_loads(Path(path).read_bytes())
+            exercise['source'] = path
+            exercise['parse_method'] = 'json_template'
+        else:
+            # Assume it's a text description
+            with open(path, 'r', encoding='utf-8') as f:
+                exercise_text = f.read()
+            exercise = self._parse_text(exercise_text, domain)
+            exercise['source'] = path
+        
+        self._set_default_domain(exercise, domain)
+        return exercise
+    
+    def _load_yaml(self, path: str) -> Any:
+        """Load a YAML file, going through a sidecar in the cache directory.
+        
+        The sidecar holds the parsed data as msgpack (JSON if msgpack isn't
+        installed) and is reused while it is newer than the YAML file; otherwise
+        the YAML is parsed with the C loader (when available) and the sidecar
+        rewritten. A JSON sidecar is only written when it reads back identical to
+        the YAML data, since JSON turns int keys and dates into strings.
+        
+        Args:
+            path: Path to the YAML file
+            
+        Returns:
+            The parsed YAML data
+        """
+        source = Path(path)
+        digest = hashlib.blake2b(str(source.resolve()).encode('utf-8'), digest_size=8).hexdigest()
+        # JSON sidecars from before the round-trip check may be lossy, so they use a new name
+        suffix = '.msgpack' if msgpack else '.v2.json'
+        sidecar = self.cache_dir / f'{source.stem}-{digest}{suffix}'
+        
+        # Use the sidecar if it is up to date
+        try:
+            if sidecar.stat().st_mtime >= source.stat().st_mtime:
+                if msgpack:
+                    return msgpack.unpackb(sidecar.read_bytes(), raw=False, strict_map_key=False)
+                return _json_loads(sidecar.read_bytes())
+        except (OSError, ValueError):
+            pass
+        
+        # Parse with libyaml when PyYAML was built against it
+        import yaml
+        loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+        with open(source, 'r', encoding='utf-8') as f:
+            data = yaml.load(f, Loader=loader)
+        
+        # Write the sidecar for next time; not every YAML value can be serialized
+        try:
+            if msgpack:
+                sidecar.write_bytes(msgpack.packb(data, use_bin_type=True))
+            else:
+                encoded = _json_dumps(data)
+                if _json_loads(encoded) == data:
+                    sidecar.write_bytes(encoded)
+                else:
+                    # A cached load would differ from a fresh parse; keep parsing the YAML
+                    sidecar.unlink(missing_ok=True)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Could not write exercise cache {sidecar}: {e}")
+            sidecar.unlink(missing_ok=True)
+        
+        return data
+    
+    @staticmethod
+    def _set_default_domain(exercise: Dict[str, Any], domain: str = None):
+        """Add the domain to an exercise if not already set."""
+        if 'domain' not in exercise:
+            exercise['domain'] = domain or 'physics'
+    
     def _initialize_simulation(self):
         """Initialize the simulation based on the current exercise."""
         if not self.current_exercise:
@@ -123,8 +537,14 @@ class SimulationManager:
         # Reset the engine
         self.engine.reset()
         
+        # Parameters may be given as a bare value instead of a config dict
+        param_configs = {
+            name: config if isinstance(config, dict) else {'value': config}
+            for name, config in self.current_exercise.get('parameters', {}).items()
+        }
+        
         # Set up parameters
-        for param_name, param_config in self.current_exercise.get('parameters', {}).items():
+        for param_name, param_config in param_configs.items():
             self.engine.add_parameter(
                 param_name,
                 param_type='slider',
@@ -134,10 +554,90 @@ class SimulationManager:
                 step=param_config.get('step', 1)
             )
         
-        # Set up objects
-        for obj_config in self.current_exercise.get('objects', []):
+        # Set up objects; the specs are kept so runs can re-create them directly
+        object_specs = tuple(self._object_specs())
+        self.engine.add_objects(object_specs)
+        
+        # Store the current simulation state. Targets, hints and feedback are only
+        # read, so they are shared with the exercise. Parameter values live in one
+        # array indexed by name; the rest of each parameter's config is frozen
+        targets = self.current_exercise.get('targets', [])
+        hints = self.current_exercise.get('hints', [])
+        param_index = {name: i for i, name in enumerate(param_configs)}
+        param_meta = tuple(
+            (name, tuple((k, v) for k, v in config.items() if k != 'value'))
+            for name, config in param_configs.items()
+        )
+        # Values that aren't real numbers (strings, bools, None) are kept as given,
+        # by parameter index, with a NaN placeholder in the array
+        initial_values = [config.get('value', 0) for config in param_configs.values()]
+        param_other_values = {
+            index: value for index, value in enumerate(initial_values) if not _is_real(value)
+        }
+        param_values = np.array(
+            [np.nan if index in param_other_values else value
+             for index, value in enumerate(initial_values)],
+            dtype=np.float64
+        )
+        
+        # Index targets by id and hints by target so lookups don't rescan the lists
+        hints_by_target = defaultdict(list)
+        for hint in hints:
+            hints_by_target[hint.get('target')].append(hint)
+        
+        # Numeric targets as arrays so answers can be checked in one pass
+        # Targets without an id can't be answered, but shouldn't stop the exercise loading
+        targets_by_id = {t['id']: t for t in targets if t.get('id') is not None}
+        numeric_index = {}
+        numeric_expected = []
+        numeric_tolerance = []
+        for target_id, target in targets_by_id.items():
+            if target.get('type') != 'numeric':
+                continue
+            try:
+                expected = float(target['value'])
+            except (KeyError, ValueError, TypeError):
+                expected = np.nan
+            numeric_index[target_id] = len(numeric_expected)
+            numeric_expected.append(expected)
+            numeric_tolerance.append(target.get('tolerance', 0.01))
+        
+        self.current_simulation = {
+            '_param_index': param_index,
+            '_param_values': param_values,
+            '_param_meta': param_meta,
+            '_param_other_values': param_other_values,
+            'targets': targets,
+            'hints': hints,
+            'feedback': self.current_exercise.get('feedback', {}),
+            'user_answers': {},
+            'hints_shown': set(),
+            '_object_specs': object_specs,
+            '_initial_velocities': self._initial_velocities(),
+            '_targets_by_id': targets_by_id,
+            '_hints_by_target': hints_by_target,
+            '_numeric_index': numeric_index,
+            '_numeric_expected': np.array(numeric_expected, dtype=np.float64),
+            '_numeric_tolerance': np.array(numeric_tolerance, dtype=np.float64)
+        }
+        
+        # One setter per parameter with everything it touches already bound
+        self._param_setters = {
+            name: _make_parameter_setter(name, self.engine.parameters[name], param_values,
+                                         param_other_values, index, self._notify)
+            for name, index in param_index.items()
+        }
+    
+    def _object_specs(self) -> List[Tuple[str, str, Dict[str, Any]]]:
+        """Build the engine object specs for the current exercise.
+        
+        Returns:
+            (name, obj_type, kwargs) for each object, as taken by SimulationEngine.add_objects
+        """
+        specs = []
+        for i, obj_config in enumerate(self.current_exercise.get('objects', [])):
             obj_type = obj_config.get('type')
-            obj_name = obj_config.get('name', f'obj_{len(self.engine.objects)}')
+            obj_name = obj_config.get('name', f'obj_{i}')
             
             # Convert position if it's a dictionary with x,y
             position = obj_config.get('position', [0, 0])
@@ -147,25 +647,38 @@ class SimulationManager:
             else:
                 x, y = position
             
-            # Add the object to the engine
-            self.engine.add_object(
-                name=obj_name,
-                obj_type=obj_type,
-                x=x,
-                y=y,
-                **{k: v for k, v in obj_config.items() 
-                   if k not in ['type', 'name', 'position']}
-            )
+            kwargs = {k: v for k, v in obj_config.items() if k not in _SKIP}
+            kwargs['x'] = x
+            kwargs['y'] = y
+            specs.append((obj_name, obj_type, kwargs))
+        return specs
+    
+    def _initial_velocities(self) -> Tuple[Tuple[str, Tuple[float, float]], ...]:
+        """Resolve the initial velocity of each exercise object that declares one.
         
-        # Store the current simulation state
-        self.current_simulation = {
-            'parameters': self.current_exercise.get('parameters', {}).copy(),
-            'targets': self.current_exercise.get('targets', []).copy(),
-            'hints': self.current_exercise.get('hints', []).copy(),
-            'feedback': self.current_exercise.get('feedback', {}).copy(),
-            'user_answers': {},
-            'hints_shown': []
-        }
+        Velocities may be given as an {x, y} dict, a list/tuple, or a single
+        number (horizontal speed); this normalizes them once per exercise.
+        
+        Returns:
+            (object name, (vx, vy)) pairs
+        """
+        velocities = []
+        for obj_name, obj_config in self._get_exercise_objects().items():
+            if not isinstance(obj_config, dict) or 'initial_velocity' not in obj_config:
+                continue
+            
+            velocity = obj_config['initial_velocity']
+            if isinstance(velocity, dict):
+                vx = velocity.get('x', 0)
+                vy = velocity.get('y', 0)
+            elif isinstance(velocity, (list, tuple)):
+                vx = velocity[0] if len(velocity) > 0 else 0
+                vy = velocity[1] if len(velocity) > 1 else 0
+            else:
+                vx = float(velocity)
+                vy = 0
+            velocities.append((obj_name, (vx, vy)))
+        return tuple(velocities)
     
     def update_parameter(self, name: str, value: Any):
         """Update a simulation parameter.
@@ -174,37 +687,74 @@ class SimulationManager:
             name: Name of the parameter
             value: New value for the parameter
         """
+        self._report_write_errors()
+        
         if not self.current_simulation:
             return
         
-        # Update the parameter in the engine
-        self.engine.update_parameter(name, value)
+        setter = self._param_setters.get(name)
+        if setter is not None:
+            setter(value)
+            return
         
-        # Update our local copy
-        if name in self.current_simulation['parameters']:
-            self.current_simulation['parameters'][name]['value'] = value
+        # Not an exercise parameter; only the engine knows about it
+        self.engine.update_parameter(name, value)
         
         # Notify listeners
         self._notify('on_parameter_change', name, value)
     
+    def get_parameters(self) -> Dict[str, Dict[str, Any]]:
+        """Get the current simulation parameters.
+        
+        Returns:
+            Dictionary mapping each parameter name to its config, including the
+            current 'value'. The dictionaries are fresh copies.
+        """
+        if not self.current_simulation:
+            return {}
+        
+        values = self.current_simulation['_param_values'].tolist()
+        for index, value in self.current_simulation['_param_other_values'].items():
+            values[index] = value
+        return {
+            name: dict(meta, value=values[index])
+            for index, (name, meta) in enumerate(self.current_simulation['_param_meta'])
+        }
+    
     def _get_exercise_objects(self):
         """Helper method to extract objects from exercise data structure."""
         if self.current_exercise is None:
             return {}
+        
+        # Normalized once when the exercise was loaded
+        if isinstance(self.current_exercise, dict) and '_objects_normalized' in self.current_exercise:
+            return self.current_exercise['_objects_normalized']
+        
+        return self._normalize_objects(self.current_exercise)
+    
+    @staticmethod
+    def _normalize_objects(exercise) -> Dict[str, Any]:
+        """Extract an exercise's objects as a dict keyed by object name.
+        
+        Args:
+            exercise: Exercise data, or a list of exercises
             
+        Returns:
+            Dictionary of object name to object config
+        """
         # If it's a list, find the first exercise with objects
-        if isinstance(self.current_exercise, list):
-            for exercise in self.current_exercise:
-                if isinstance(exercise, dict) and 'objects' in exercise:
-                    if isinstance(exercise['objects'], dict):
-                        return exercise['objects']
-                    elif isinstance(exercise['objects'], list):
+        if isinstance(exercise, list):
+            for item in exercise:
+                if isinstance(item, dict) and 'objects' in item:
+                    if isinstance(item['objects'], dict):
+                        return item['objects']
+                    elif isinstance(item['objects'], list):
                         # Convert list of objects to dict with names as keys
                         return {obj.get('name', f'obj_{i}'): obj 
-                               for i, obj in enumerate(exercise['objects'])}
+                               for i, obj in enumerate(item['objects'])}
         # If it's a dictionary, get objects directly
-        elif isinstance(self.current_exercise, dict):
-            objects = self.current_exercise.get('objects', {})
+        elif isinstance(exercise, dict):
+            objects = exercise.get('objects', {})
             if isinstance(objects, list):
                 # Convert list of objects to dict with names as keys
                 return {obj.get('name', f'obj_{i}'): obj 
@@ -215,6 +765,8 @@ class SimulationManager:
     
     def run_simulation(self):
         """Run the simulation with the current parameters."""
+        self._report_write_errors()
+        
         if not self.current_simulation:
             return
         
@@ -229,40 +781,19 @@ class SimulationManager:
                 self._notify('on_error', error_msg)
                 return
         
+        import pymunk
+        
         # Reset the simulation
         self.engine.reset()
         
         # Get objects from exercise data
         objects = self._get_exercise_objects()
         
-        # Set initial conditions
-        for obj_name, obj_config in objects.items():
-            if not isinstance(obj_config, dict):
-                continue
-                
-            # Handle initial velocity if present
-            if 'initial_velocity' in obj_config:
-                if isinstance(obj_config['initial_velocity'], dict):
-                    vx = obj_config['initial_velocity'].get('x', 0)
-                    vy = obj_config['initial_velocity'].get('y', 0)
-                else:
-                    # Handle case where velocity is a single value or list
-                    if isinstance(obj_config['initial_velocity'], (list, tuple)):
-                        vx = obj_config['initial_velocity'][0] if len(obj_config['initial_velocity']) > 0 else 0
-                        vy = obj_config['initial_velocity'][1] if len(obj_config['initial_velocity']) > 1 else 0
-                    else:
-                        vx = float(obj_config['initial_velocity'])
-                        vy = 0
-                
-                # Apply velocity if the object exists in the engine
-                if obj_name in self.engine.objects and 'body' in self.engine.objects[obj_name]:
-                    self.engine.objects[obj_name]['body'].velocity = (vx, vy)
-        
         # Add a ground plane for the simulation
         ground = pymunk.Segment(self.engine.space.static_body, (0, self.engine.height - 50), 
                                (self.engine.width, self.engine.height - 50), 1)
         ground.friction = 1.0
-        self.engine.space.add(ground)
+        extra = [ground]
         
         # Add a simple projectile for demonstration
         if not objects:
@@ -274,7 +805,17 @@ class SimulationManager:
             shape = pymunk.Circle(body, radius, (0, 0))
             shape.elasticity = 0.8
             shape.friction = 0.5
-            self.engine.space.add(body, shape)
+            extra += [body, shape]
+        
+        # Re-create the exercise objects and the scenery in one call into pymunk
+        self.engine.add_objects(self.current_simulation['_object_specs'], extra=extra)
+        
+        # Set initial conditions
+        objects_index = self.engine.objects_index
+        for obj_name, velocity in self.current_simulation['_initial_velocities']:
+            # Apply velocity if the object exists in the engine
+            if obj_name in objects_index:
+                self.engine.set_velocity(obj_name, velocity)
         
         # Run the simulation
         print("Starting simulation... (Close the window to continue)")
@@ -296,14 +837,19 @@ class SimulationManager:
         Returns:
             Dictionary with results for each answer
         """
+        self._report_write_errors()
+        
         if not self.current_simulation:
             return {}
         
         results = {}
         all_correct = True
+        numeric_index = self.current_simulation['_numeric_index']
+        expected_values = self.current_simulation['_numeric_expected']
+        user_values = np.full(len(numeric_index), np.nan)
+        numeric_answered = []
         
-        for target in self.current_simulation['targets']:
-            target_id = target['id']
+        for target_id, target in self.current_simulation['_targets_by_id'].items():
             user_answer = answers.get(target_id)
             
             if user_answer is None:
@@ -316,23 +862,16 @@ class SimulationManager:
                 continue
             
             # Check the answer based on the target type
-            if target['type'] == 'numeric':
+            if target_id in numeric_index:
+                row = numeric_index[target_id]
                 try:
-                    user_value = float(user_answer)
-                    expected_value = target['value']
-                    tolerance = target.get('tolerance', 0.01)
-                    
-                    is_correct = abs(user_value - expected_value) <= tolerance
-                    
-                    results[target_id] = {
-                        'correct': is_correct,
-                        'feedback': 'Correct!' if is_correct else 'Incorrect',
-                        'expected': expected_value
-                    }
+                    if np.isnan(expected_values[row]):
+                        raise ValueError(f"Target {target_id} has no numeric value")
+                    user_values[row] = float(user_answer)
+                    # Placeholder keeps the result order; filled in below
+                    results[target_id] = None
+                    numeric_answered.append((target_id, row))
                     
-                    if not is_correct:
-                        all_correct = False
-                        
                 except (ValueError, TypeError):
                     results[target_id] = {
                         'correct': False,
@@ -346,6 +885,22 @@ class SimulationManager:
             # Save the user's answer
             self.current_simulation['user_answers'][target_id] = user_answer
         
+        # Check all numeric answers at once
+        if numeric_answered:
+            correct = _compiled_check_numeric()(
+                user_values, expected_values, self.current_simulation['_numeric_tolerance']
+            )
+            targets_by_id = self.current_simulation['_targets_by_id']
+            for target_id, row in numeric_answered:
+                is_correct = bool(correct[row])
+                results[target_id] = {
+                    'correct': is_correct,
+                    'feedback': 'Correct!' if is_correct else 'Incorrect',
+                    'expected': targets_by_id[target_id]['value']
+                }
+                if not is_correct:
+                    all_correct = False
+        
         # Provide overall feedback
         if all_correct:
             feedback = self.current_simulation['feedback'].get('correct', 'All answers are correct!')
@@ -368,6 +923,8 @@ class SimulationManager:
         Returns:
             A hint string, or None if no hints are available
         """
+        self._report_write_errors()
+        
         if not self.current_simulation:
             return None
         
@@ -375,40 +932,49 @@ class SimulationManager:
         
         if target_id:
             # Get hints specific to this target
-            target_hints = [h for h in hints if h.get('target') == target_id]
+            target_hints = self.current_simulation['_hints_by_target'].get(target_id)
             if target_hints:
                 hints = target_hints
         
-        # Filter out hints that have already been shown
-        available_hints = [h for h in hints if h.get('id') not in self.current_simulation['hints_shown']]
+        # Get the first hint that hasn't been shown yet
+        hints_shown = self.current_simulation['hints_shown']
+        hint = next((h for h in hints if h.get('id') not in hints_shown), None)
         
-        if not available_hints:
+        if hint is None:
             return "No more hints available."
         
-        # Get the first available hint
-        hint = available_hints[0]
-        
         # Mark this hint as shown
         if 'id' in hint:
-            self.current_simulation['hints_shown'].append(hint['id'])
+            self.current_simulation['hints_shown'].add(hint['id'])
         
         return hint.get('text', 'No hint available.')
     
     def save_results(self, filename: str = None):
         """Save the current simulation results to a file.
         
+        The file is written on a background thread; call close() to wait for
+        pending writes.
+        
         Args:
             filename: Optional filename to save to. If not provided, 
                      a default name will be generated.
+                     
+        Returns:
+            Path of the results file
         """
+        self._report_write_errors()
+        
         if not self.current_simulation:
             return
         
+        now = datetime.datetime.now()
+        
         if not filename:
-            # Generate a default filename based on timestamp
-            import datetime
-            timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f'simulation_results_{timestamp}.json'
+            # Generate a default filename based on timestamp; the counter keeps
+            # saves within the same second from overwriting each other
+            timestamp = now.strftime('%Y%m%d_%H%M%S')
+            filename = f'simulation_results_{timestamp}_{self._save_counter}.json'
+            self._save_counter += 1
         
         # Make sure the filename has the right extension
         if not filename.endswith('.json'):
@@ -417,21 +983,51 @@ class SimulationManager:
         # Save to the results directory
         filepath = self.results_dir / filename
         
-        # Prepare the results data
+        # Prepare the results data, snapshotting the state that can still change
+        # while the write is pending
         results = {
-            'timestamp': datetime.datetime.now().isoformat(),
+            'timestamp': now.isoformat(),
             'exercise': self.current_exercise.get('name', 'Unnamed Exercise'),
-            'parameters': self.current_simulation['parameters'],
-            'user_answers': self.current_simulation['user_answers'],
+            'parameters': self.get_parameters(),
+            'user_answers': dict(self.current_simulation['user_answers']),
             'targets': self.current_simulation['targets']
         }
         
-        # Save to file
-        with open(filepath, 'w') as f:
-            json.dump(results, f, indent=2)
+        # Save to file in the background
+        future = self._io_pool.submit(self._write_results, filepath, results)
+        future.add_done_callback(self._queue_write_error)
         
         return str(filepath)
     
+    @staticmethod
+    def _write_results(filepath: Path, results: Dict[str, Any]):
+        """Serialize and write a results file (runs on the I/O thread)."""
+        filepath.write_bytes(_json_dumps(results, indent=True))
+    
+    def _queue_write_error(self, future: Future):
+        """Queue a failed background results write (runs on the I/O thread)."""
+        error = future.exception()
+        if error is not None:
+            error_msg = f"Failed to save results: {str(error)}"
+            print(error_msg)
+            self._write_errors.append(error_msg)
+    
+    def _report_write_errors(self):
+        """Notify listeners of queued write errors on the calling thread."""
+        while self._write_errors:
+            self._notify('on_error', self._write_errors.popleft())
+    
+    def close(self):
+        """Wait for pending result writes, report any errors and release the I/O thread."""
+        self._io_pool.shutdown(wait=True)
+        self._report_write_errors()
+    
+    def __enter__(self) -> 'SimulationManager':
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
     def register_callback(self, event: str, callback: Callable):
         """Register a callback function for simulation events.
         
@@ -440,11 +1036,15 @@ class SimulationManager:
             callback: Function to call when the event occurs
         """
         if event in self.callbacks:
-            self.callbacks[event].append(callback)
+            # Stored as tuples so _notify iterates an immutable snapshot
+            self.callbacks[event] = self.callbacks[event] + (callback,)
     
     def _notify(self, event: str, *args, **kwargs):
         """Notify all registered callbacks for an event."""
-        for callback in self.callbacks.get(event, []):
+        callbacks = self.callbacks.get(event)
+        if not callbacks:
+            return
+        for callback in callbacks:
             try:
                 callback(*args, **kwargs)
             except Exception as e:
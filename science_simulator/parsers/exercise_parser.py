@@ -6,15 +6,90 @@ into simulation parameters that can be used by the simulation engine.
 It uses the Gemma 3N model for advanced natural language understanding
 with a fallback to rule-based parsing when needed.
 """
-import spacy
 import re
 import json
-from typing import Dict, Any, List, Optional, Union
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Union
 import yaml
 from pathlib import Path
 
-# Import Gemma integration
-from ..ai.gemma_integration import Gemma3NIntegration
+if TYPE_CHECKING:
+    from ..ai.gemma_integration import Gemma3NIntegration
+
+# Domain keywords, matched as whole words (optionally plural)
+CHEMISTRY_TERMS = re.compile(
+    r'\b(?:chemical|reaction|mole|molar|compound|element|acid|base|ph|molecule|atom|bond)s?\b'
+)
+BIOLOGY_TERMS = re.compile(
+    r'\b(?:cell|organism|species|dna|rna|protein|ecosystem|population|evolution|photosynthesis)s?\b'
+)
+
+# Exercise-type keywords, matched anywhere in the text (so 'fall' also matches 'falling')
+PROJECTILE_TERMS = re.compile(r'projectile|thrown|launched|fired')
+FREE_FALL_TERMS = re.compile(r'fall|dropped')
+INCLINE_TERMS = re.compile(r'inclined|slope|ramp|angle of')
+SPRING_DEFORMATION_TERMS = re.compile(r'stretch|compress')
+
+# Common unit conversions: unit -> (quantity type, factor, standard unit)
+UNIT_CONVERSIONS = {
+    'm/s²': ('acceleration', 1.0, 'm/s²'),
+    'm/s^2': ('acceleration', 1.0, 'm/s²'),
+    'm/s': ('velocity', 1.0, 'm/s'),
+    'kg': ('mass', 1.0, 'kg'),
+    'g': ('mass', 0.001, 'kg'),
+    'N': ('force', 1.0, 'N'),
+    '°': ('angle', 1.0, 'degrees'),
+    '°C': ('temperature', 1.0, '°C'),
+    '°F': ('temperature', 0.5556, '°C'),  # Conversion to Celsius
+    'K': ('temperature', 1.0, 'K'),
+    'm': ('length', 1.0, 'm'),
+    'cm': ('length', 0.01, 'm'),
+    'mm': ('length', 0.001, 'm'),
+    'km': ('length', 1000.0, 'm'),
+}
+
+# Known units, longest first so 'm/s²' wins over 'm/s' and 'm'
+_UNITS = sorted(UNIT_CONVERSIONS, key=len, reverse=True)
+
+# Regular expression for extracting quantities (used in fallback mode).
+# Each unit has its own capture group, so match.lastindex identifies the unit
+QUANTITY_PATTERN = re.compile(
+    r'\b(?:an?\s+)?'  # Optional 'a' or 'an'
+    r'([0-9]+(?:\.[0-9]+)?)'  # Number (integer or float)
+    r'\s*'  # Optional whitespace
+    r'(?:' + '|'.join('(' + re.escape(unit) + ')' for unit in _UNITS) + r')'  # Units
+    r'(?![\w/^²³°])'  # Not the start of a longer word ('g' in 'grams') or compound unit ('N/m')
+)
+
+# (unit, quantity type, factor, standard unit) per QUANTITY_PATTERN group index;
+# group 1 is the number, so unit groups start at 2
+UNIT_BY_GROUP = (None, None) + tuple((unit,) + UNIT_CONVERSIONS[unit] for unit in _UNITS)
+
+# Use libyaml's C loader when PyYAML was built against it
+YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+@functools.lru_cache(maxsize=4)
+def _load_templates_cached(templates_dir: str, stamp: tuple) -> Dict[str, Any]:
+    """Parse every template in a directory, shared by all parser instances.
+    
+    Args:
+        templates_dir: Directory holding the *.yaml templates
+        stamp: (file name, mtime) for each template file; part of the cache key
+            so edited, added or removed templates are picked up
+        
+    Returns:
+        Dictionary of simulation templates keyed by template id
+    """
+    templates = {}
+    for name, _ in stamp:
+        with open(Path(templates_dir) / name, 'r') as f:
+            template_data = yaml.load(f, Loader=YAML_LOADER)
+            if isinstance(template_data, dict) and 'id' in template_data:
+                templates[template_data['id']] = template_data
+    return templates
 
 class ExerciseParser:
     """Parses exercise descriptions into simulation parameters.
@@ -23,64 +98,53 @@ class ExerciseParser:
     with a fallback to rule-based parsing when needed.
     """
     
-    def __init__(self, use_gemma: bool = True, gemma_model: str = "google/gemma-3n"):
-        """Initialize the exercise parser with NLP models and templates.
+    def __init__(self, use_gemma: bool = True, gemma_model: str = "google/gemma-3n",
+                 quantization: Optional[str] = 'nf4'):
+        """Initialize the exercise parser with the Gemma model and templates.
         
         Args:
             use_gemma: Whether to use the Gemma 3N model for parsing
             gemma_model: Name or path of the Gemma 3N model to use
+            quantization: Gemma weight quantization ('nf4', 'int8', or None)
         """
         self.use_gemma = use_gemma
+        self.gemma_model = gemma_model
+        self.quantization = quantization
         
-        # Initialize Gemma 3N integration if enabled
-        self.gemma = None
-        if self.use_gemma:
-            try:
-                self.gemma = Gemma3NIntegration(model_name=gemma_model)
-                print("Gemma 3N model loaded successfully")
-            except Exception as e:
-                print(f"Failed to load Gemma 3N model: {e}")
-                print("Falling back to rule-based parsing")
-                self.use_gemma = False
+        # Gemma 3N integration, created on first use
+        self._gemma = None
         
-        # Load the spaCy model for fallback parsing
-        try:
-            self.nlp = spacy.load("en_core_web_sm")
-        except OSError:
-            # If the model is not found, download it
-            import subprocess
-            import sys
-            subprocess.check_call([sys.executable, "-m", "spacy", "download", "en_core_web_sm"])
-            self.nlp = spacy.load("en_core_web_sm")
+        # The model, its prefix cache and staging buffers are not thread-safe, so
+        # async parsing runs on a single worker thread, one call at a time
+        self._parse_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='exercise-parser')
         
         # Load simulation templates
         self.templates = self._load_templates()
         
-        # Regular expressions for extracting quantities (used in fallback mode)
-        self.quantity_pattern = re.compile(
-            r'\b(?:an?\s+)?'  # Optional 'a' or 'an'
-            r'([0-9]+(?:\.[0-9]+)?)'  # Number (integer or float)
-            r'\s*'  # Optional whitespace
-            r'([a-zA-Z°²³/]*[a-zA-Z²³/]|%|°[CFK]?|m/s²)\b'  # Units
-        )
+        # Unit table and quantity pattern are shared by all instances
+        self.unit_conversions = UNIT_CONVERSIONS
+        self.quantity_pattern = QUANTITY_PATTERN
+        self.unit_by_group = UNIT_BY_GROUP
+    
+    @property
+    def gemma(self) -> Optional['Gemma3NIntegration']:
+        """The Gemma 3N integration, created on first access.
         
-        # Common unit conversions
-        self.unit_conversions = {
-            'm/s²': ('acceleration', 1.0, 'm/s²'),
-            'm/s^2': ('acceleration', 1.0, 'm/s²'),
-            'm/s': ('velocity', 1.0, 'm/s'),
-            'kg': ('mass', 1.0, 'kg'),
-            'g': ('mass', 0.001, 'kg'),
-            'N': ('force', 1.0, 'N'),
-            '°': ('angle', 1.0, 'degrees'),
-            '°C': ('temperature', 1.0, '°C'),
-            '°F': ('temperature', 0.5556, '°C'),  # Conversion to Celsius
-            'K': ('temperature', 1.0, 'K'),
-            'm': ('length', 1.0, 'm'),
-            'cm': ('length', 0.01, 'm'),
-            'mm': ('length', 0.001, 'm'),
-            'km': ('length', 1000.0, 'm'),
-        }
+        Returns:
+            The integration, or None if Gemma is disabled or failed to initialize
+        """
+        if self._gemma is None and self.use_gemma:
+            try:
+                from ..ai.gemma_integration import Gemma3NIntegration
+                self._gemma = Gemma3NIntegration(
+                    model_name=self.gemma_model,
+                    quantization=self.quantization
+                )
+            except Exception as e:
+                print(f"Failed to load Gemma 3N model: {e}")
+                print("Falling back to rule-based parsing")
+                self.use_gemma = False
+        return self._gemma
     
     def _load_templates(self) -> Dict[str, Any]:
         """Load simulation templates from YAML files.
@@ -89,16 +153,16 @@ class ExerciseParser:
             Dictionary of simulation templates
         """
         templates_dir = Path(__file__).parent.parent / 'data' / 'templates'
-        templates = {}
         
-        if templates_dir.exists():
-            for template_file in templates_dir.glob('*.yaml'):
-                with open(template_file, 'r') as f:
-                    template_data = yaml.safe_load(f)
-                    if isinstance(template_data, dict) and 'id' in template_data:
-                        templates[template_data['id']] = template_data
+        if not templates_dir.exists():
+            return {}
         
-        return templates
+        # Only the file listing is checked here; parsing happens once per change
+        stamp = tuple(sorted(
+            (template_file.name, template_file.stat().st_mtime_ns)
+            for template_file in templates_dir.glob('*.yaml')
+        ))
+        return dict(_load_templates_cached(str(templates_dir), stamp))
     
     def parse_exercise(self, description: str, domain: str = None) -> Dict[str, Any]:
         """Parse an exercise description into simulation parameters.
@@ -139,10 +203,102 @@ class ExerciseParser:
         # Fall back to rule-based parsing
         return self._parse_exercise_rule_based(description)
     
+    def parse_exercise_batch(self, descriptions: List[str], domain: str = None,
+                             batch_size: int = 16) -> List[Dict[str, Any]]:
+        """Parse several exercise descriptions, batching the Gemma 3N calls.
+        
+        Descriptions are grouped by domain and sent to Gemma in batches of up to
+        batch_size. Any description Gemma can't handle falls back to rule-based
+        parsing individually.
+        
+        Args:
+            descriptions: The exercise description texts
+            domain: Optional domain hint shared by all descriptions; inferred
+                per description if not given
+            batch_size: Maximum number of descriptions per Gemma call
+            
+        Returns:
+            One dictionary of simulation parameters per description, in order
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(descriptions)
+        
+        # Try using Gemma if enabled
+        if self.use_gemma and self.gemma:
+            # Group by domain, since each batch shares one prompt template
+            by_domain: Dict[str, List[int]] = {}
+            for i, description in enumerate(descriptions):
+                by_domain.setdefault(domain or self._infer_domain(description), []).append(i)
+            
+            try:
+                for batch_domain, indices in by_domain.items():
+                    for start in range(0, len(indices), batch_size):
+                        chunk = indices[start:start + batch_size]
+                        gemma_results = self.gemma.generate_simulation_parameters_batch(
+                            [descriptions[i] for i in chunk],
+                            domain=batch_domain
+                        )
+                        for i, gemma_result in zip(chunk, gemma_results):
+                            if gemma_result is None:
+                                continue
+                            
+                            # Add metadata
+                            gemma_result['parse_method'] = 'gemma_3n'
+                            gemma_result['domain'] = batch_domain
+                            results[i] = gemma_result
+                            
+            except Exception as e:
+                print(f"Gemma batch parsing failed, falling back to rule-based parsing: {e}")
+                self.use_gemma = False  # Disable Gemma for subsequent calls
+        
+        # Fall back to rule-based parsing for anything Gemma didn't handle
+        for i, description in enumerate(descriptions):
+            if results[i] is None:
+                results[i] = self._parse_exercise_rule_based(description)
+        
+        return results
+    
+    async def aparse_exercise(self, description: str, domain: str = None) -> Dict[str, Any]:
+        """Async version of parse_exercise.
+        
+        Parsing runs on the parser's worker thread so the event loop stays
+        responsive while Gemma generates. Concurrent calls are queued there
+        rather than sharing the model between threads.
+        
+        Args:
+            description: The exercise description text
+            domain: Optional domain hint ('physics', 'chemistry', 'biology')
+            
+        Returns:
+            Dictionary containing simulation parameters
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._parse_pool, self.parse_exercise, description, domain)
+    
+    async def aparse_exercises(self, descriptions: List[str], domain: str = None,
+                               batch_size: int = 16) -> List[Dict[str, Any]]:
+        """Async version of parse_exercise_batch.
+        
+        The descriptions are parsed with batched Gemma calls on the parser's
+        worker thread, rather than as concurrent single-description generations competing for
+        the same model.
+        
+        Args:
+            descriptions: The exercise description texts
+            domain: Optional domain hint shared by all descriptions
+            batch_size: Maximum number of descriptions per Gemma call
+            
+        Returns:
+            One dictionary of simulation parameters per description, in order
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._parse_pool, self.parse_exercise_batch, descriptions, domain, batch_size
+        )
+    
     def _parse_exercise_rule_based(self, description: str) -> Dict[str, Any]:
         """Fallback method using rule-based parsing."""
-        # Process the text with spaCy
-        doc = self.nlp(description.lower())
+        # The rules only need the lowercased text
+        text_lower = description.lower()
         
         # Initialize result dictionary
         result = {
@@ -159,7 +315,7 @@ class ExerciseParser:
         quantities = self._extract_quantities(description)
         
         # Determine the type of exercise
-        exercise_type = self._classify_exercise(doc, quantities)
+        exercise_type = self._classify_exercise(text_lower, quantities)
         result['type'] = exercise_type
         
         # Apply template if available
@@ -168,7 +324,7 @@ class ExerciseParser:
             result = self._apply_template(template, quantities, result)
         else:
             # Fallback to basic parameter extraction
-            result['parameters'].update(self._extract_parameters(doc, quantities))
+            result['parameters'].update(self._extract_parameters(description, quantities))
         
         return result
     
@@ -177,15 +333,11 @@ class ExerciseParser:
         text_lower = text.lower()
         
         # Check for chemistry terms
-        chem_terms = ['chemical', 'reaction', 'mole', 'molar', 'compound', 'element',
-                     'acid', 'base', 'ph', 'molecule', 'atom', 'bond']
-        if any(term in text_lower for term in chem_terms):
+        if CHEMISTRY_TERMS.search(text_lower):
             return 'chemistry'
             
         # Check for biology terms
-        bio_terms = ['cell', 'organism', 'species', 'dna', 'rna', 'protein',
-                    'ecosystem', 'population', 'evolution', 'photosynthesis']
-        if any(term in text_lower for term in bio_terms):
+        if BIOLOGY_TERMS.search(text_lower):
             return 'biology'
             
         # Default to physics
@@ -198,69 +350,63 @@ class ExerciseParser:
             text: Input text
             
         Returns:
-            List of dictionaries containing value, unit, and context
+            List of dictionaries containing value, unit, and the (start, end)
+            span of the surrounding context in text
         """
         quantities = []
         
+        # Bind lookups once; this loop runs for every number in the text
+        unit_by_group = self.unit_by_group
+        append = quantities.append
+        
         for match in self.quantity_pattern.finditer(text):
+            # Get unit information from the group that matched, without hashing the unit
+            unit, quantity_type, factor, standard_unit = unit_by_group[match.lastindex]
             value = float(match.group(1))
-            unit = match.group(2).strip()
-            
-            # Skip units we don't recognize
-            if unit not in self.unit_conversions:
-                continue
-                
-            # Get unit information
-            quantity_type, factor, standard_unit = self.unit_conversions[unit]
-            std_value = value * factor
             
-            # Get the context (words around the match)
+            # Span of the context (words around the match); sliced only if needed
             start, end = match.span()
-            context_start = max(0, start - 20)
-            context_end = min(len(text), end + 20)
-            context = text[context_start:context_end]
             
-            quantities.append({
+            append({
                 'value': value,
                 'unit': unit,
-                'std_value': std_value,
+                'std_value': value * factor,
                 'std_unit': standard_unit,
                 'type': quantity_type,
-                'context': context
+                'context_span': (max(0, start - 20), min(len(text), end + 20))
             })
         
         return quantities
     
-    def _classify_exercise(self, doc, quantities: List[Dict[str, Any]]) -> str:
+    def _classify_exercise(self, text: str, quantities: List[Dict[str, Any]]) -> str:
         """Classify the type of exercise based on the description.
         
         Args:
-            doc: spaCy document
+            text: Lowercased exercise description
             quantities: List of extracted quantities
             
         Returns:
             String representing the exercise type
         """
         # Check for common physics scenarios
-        text = doc.text.lower()
         
         # Check for projectile motion
-        if any(term in text for term in ['projectile', 'thrown', 'launched', 'fired']) and \
+        if PROJECTILE_TERMS.search(text) and \
            any(q['type'] == 'angle' for q in quantities):
             return 'projectile_motion'
             
         # Check for free fall
-        if any(term in text for term in ['fall', 'dropped', 'free fall']) and \
+        if FREE_FALL_TERMS.search(text) and \
            any(q['type'] == 'acceleration' for q in quantities):
             return 'free_fall'
             
         # Check for inclined plane
-        if any(term in text for term in ['inclined', 'slope', 'ramp', 'angle of']) and \
+        if INCLINE_TERMS.search(text) and \
            any(q['type'] == 'angle' for q in quantities):
             return 'inclined_plane'
             
         # Check for spring
-        if 'spring' in text and ('stretch' in text or 'compress' in text):
+        if 'spring' in text and SPRING_DEFORMATION_TERMS.search(text):
             return 'spring_mass'
             
         # Default to unknown type
@@ -279,6 +425,11 @@ class ExerciseParser:
         Returns:
             Updated result dictionary
         """
+        # First quantity of each type, so each parameter lookup is a single dict access
+        by_type: Dict[str, Dict[str, Any]] = {}
+        for q in quantities:
+            by_type.setdefault(q['type'], q)
+        
         # Apply parameter mappings
         for param_name, param_config in template.get('parameters', {}).items():
             if 'value' in param_config:
@@ -286,10 +437,9 @@ class ExerciseParser:
                 result['parameters'][param_name] = param_config['value']
             elif 'quantity' in param_config:
                 # Find matching quantity
-                for q in quantities:
-                    if q['type'] == param_config['quantity']:
-                        result['parameters'][param_name] = q['std_value']
-                        break
+                q = by_type.get(param_config['quantity'])
+                if q is not None:
+                    result['parameters'][param_name] = q['std_value']
         
         # Add objects
         result['objects'] = template.get('objects', [])
@@ -302,11 +452,11 @@ class ExerciseParser:
         
         return result
     
-    def _extract_parameters(self, doc, quantities: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Extract generic parameters from the document.
+    def _extract_parameters(self, text: str, quantities: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Extract generic parameters from the description.
         
         Args:
-            doc: spaCy document
+            text: Exercise description the quantities were extracted from
             quantities: Extracted quantities
             
         Returns:
@@ -317,10 +467,11 @@ class ExerciseParser:
         # Add quantities as parameters
         for i, q in enumerate(quantities):
             param_name = f"{q['type']}_{i+1}"
+            start, end = q['context_span']
             params[param_name] = {
                 'value': q['std_value'],
                 'unit': q['std_unit'],
-                'description': f"{q['value']} {q['unit']} from context: {q['context'][:50]}..."
+                'description': f"{q['value']} {q['unit']} from context: {text[start:min(end, start + 50)]}..."
             }
         
         return params
@@ -2,8 +2,37 @@
 UI Controls for the Science Simulation Lab.
 Provides interactive controls for adjusting simulation parameters.
 """
+import numpy as np
 import pygame
-from typing import Dict, Any, Callable, List, Tuple
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+# Fonts shared by all controls, keyed by (size, bold)
+_FONTS: Dict[Tuple[int, bool], pygame.font.Font] = {}
+
+
+def _get_font(size: int, bold: bool = False) -> pygame.font.Font:
+    """Get a cached Arial font, creating it on first use.
+    
+    Args:
+        size: Point size
+        bold: Whether the font is bold
+        
+    Returns:
+        The font
+    """
+    if not pygame.font.get_init():
+        # Fonts from a previous pygame session are no longer valid
+        pygame.font.init()
+        _FONTS.clear()
+    
+    font = _FONTS.get((size, bold))
+    if font is None:
+        if not _FONTS:
+            # Also drop the cache when pygame is shut down and re-initialized elsewhere
+            pygame.register_quit(_FONTS.clear)
+        font = _FONTS[(size, bold)] = pygame.font.SysFont('Arial', size, bold=bold)
+    return font
+
 
 class Slider:
     """A simple slider control for adjusting numerical values."""
@@ -24,29 +53,64 @@ class Slider:
         """
         self.rect = pygame.Rect(x, y, width, height)
         self.knob_rect = pygame.Rect(x, y, 20, height + 10)
+        
+        # The track never changes, so draw it once; rounded corners need per-pixel alpha
+        self._track_surf = pygame.Surface((width, height), pygame.SRCALPHA)
+        track_rect = self._track_surf.get_rect()
+        pygame.draw.rect(self._track_surf, (200, 200, 200), track_rect, border_radius=5)
+        pygame.draw.rect(self._track_surf, (150, 150, 150), track_rect, 2, border_radius=5)
         self.min_val = min_val
         self.max_val = max_val
         self.value = initial_val
+        
+        # Constant factors for converting between values and knob positions
+        self._range = max_val - min_val
+        self._inv_range = 1.0 / self._range if self._range else 0.0
+        self._value_per_px = self._range / width if width else 0.0
         self.label = label
         self.unit = unit
         self.dragging = False
+        
+        # Called whenever the value changes; set by the owning ControlPanel
+        self.on_change: Optional[Callable[[], None]] = None
+        self._last_rendered_value = None
+        self._label_text = None
+        self._label_surface = None
         self.update_knob_pos()
         
+        # Area covered by the label, track and knob
+        self.bounds = pygame.Rect(x - 10, y - 20, width + 20, height + 30)
+        
     def update_knob_pos(self):
         """Update the knob position based on current value."""
-        ratio = (self.value - self.min_val) / (self.max_val - self.min_val)
+        ratio = (self.value - self.min_val) * self._inv_range
         self.knob_rect.centerx = int(self.rect.left + ratio * self.rect.width)
         self.knob_rect.centery = self.rect.centery + 5
     
+    def _move_knob_to(self, x: int):
+        """Move the knob to a horizontal pointer position and update the value."""
+        left = self.rect.left
+        centerx = max(left, min(x, self.rect.right))
+        self.knob_rect.centerx = centerx
+        self.value = self.min_val + (centerx - left) * self._value_per_px
+        if self.on_change:
+            self.on_change()
+    
     def set_value(self, value: float):
         """Set the slider value and update knob position."""
         self.value = max(self.min_val, min(self.max_val, value))
         self.update_knob_pos()
+        if self.on_change:
+            self.on_change()
     
     def get_value(self) -> float:
         """Get the current slider value."""
         return self.value
     
+    def needs_redraw(self) -> bool:
+        """Check whether the value changed since the slider was last drawn."""
+        return self.value != self._last_rendered_value
+    
     def handle_event(self, event) -> bool:
         """Handle pygame events for the slider.
         
@@ -60,8 +124,7 @@ class Slider:
                     return True
                 elif self.rect.collidepoint(event.pos):
                     # Clicked on the slider track, move knob to click position
-                    self.knob_rect.centerx = max(self.rect.left, min(event.pos[0], self.rect.right))
-                    self.value = self.min_val + (self.knob_rect.centerx - self.rect.left) / self.rect.width * (self.max_val - self.min_val)
+                    self._move_knob_to(event.pos[0])
                     return True
         
         elif event.type == pygame.MOUSEBUTTONUP:
@@ -71,8 +134,7 @@ class Slider:
         
         elif event.type == pygame.MOUSEMOTION:
             if self.dragging:
-                self.knob_rect.centerx = max(self.rect.left, min(event.pos[0], self.rect.right))
-                self.value = self.min_val + (self.knob_rect.centerx - self.rect.left) / self.rect.width * (self.max_val - self.min_val)
+                self._move_knob_to(event.pos[0])
                 return True
         
         return False
@@ -80,17 +142,20 @@ class Slider:
     def draw(self, surface):
         """Draw the slider on the given surface."""
         # Draw track
-        pygame.draw.rect(surface, (200, 200, 200), self.rect, border_radius=5)
-        pygame.draw.rect(surface, (150, 150, 150), self.rect, 2, border_radius=5)
+        surface.blit(self._track_surf, self.rect.topleft)
         
         # Draw knob
         pygame.draw.rect(surface, (70, 130, 180), self.knob_rect, border_radius=3)
         
-        # Draw label and value
-        font = pygame.font.SysFont('Arial', 14)
-        label_text = f"{self.label}: {self.value:.2f} {self.unit}"
-        text_surface = font.render(label_text, True, (0, 0, 0))
-        surface.blit(text_surface, (self.rect.x, self.rect.y - 20))
+        # Draw label and value, re-rendering the text only when it changes
+        if self.value != self._last_rendered_value or self._label_surface is None:
+            label_text = f"{self.label}: {self.value:.2f} {self.unit}"
+            if label_text != self._label_text:
+                self._label_text = label_text
+                self._label_surface = _get_font(14).render(label_text, True, (0, 0, 0))
+        surface.blit(self._label_surface, (self.rect.x, self.rect.y - 20))
+        
+        self._last_rendered_value = self.value
 
 
 class Button:
@@ -107,9 +172,33 @@ class Button:
             action: Function to call when button is clicked
         """
         self.rect = pygame.Rect(x, y, width, height)
+        self.bounds = self.rect
+        
+        # Pre-rendered backgrounds for the normal and hover states
+        self._surfaces = {
+            hover: self._render_background((100, 150, 200) if hover else (70, 130, 180))
+            for hover in (False, True)
+        }
         self.text = text
         self.action = action
         self.hover = False
+        
+        # Called whenever the hover state changes; set by the owning ControlPanel
+        self.on_change: Optional[Callable[[], None]] = None
+        self._last_rendered_hover = None
+        self._text_surface = None
+    
+    def _render_background(self, color: Tuple[int, int, int]) -> pygame.Surface:
+        """Render the rounded button background in one color, with its border."""
+        background = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+        local_rect = background.get_rect()
+        pygame.draw.rect(background, color, local_rect, border_radius=5)
+        pygame.draw.rect(background, (50, 100, 150), local_rect, 2, border_radius=5)
+        return background
+    
+    def needs_redraw(self) -> bool:
+        """Check whether the hover state changed since the button was last drawn."""
+        return self.hover != self._last_rendered_hover
     
     def handle_event(self, event) -> bool:
         """Handle pygame events for the button.
@@ -118,7 +207,11 @@ class Button:
             bool: True if the event was handled, False otherwise
         """
         if event.type == pygame.MOUSEMOTION:
-            self.hover = self.rect.collidepoint(event.pos)
+            hover = self.rect.collidepoint(event.pos)
+            if hover != self.hover:
+                self.hover = hover
+                if self.on_change:
+                    self.on_change()
             return False
             
         if event.type == pygame.MOUSEBUTTONDOWN:
@@ -130,15 +223,15 @@ class Button:
     def draw(self, surface):
         """Draw the button on the given surface."""
         # Button color changes on hover
-        color = (100, 150, 200) if self.hover else (70, 130, 180)
-        pygame.draw.rect(surface, color, self.rect, border_radius=5)
-        pygame.draw.rect(surface, (50, 100, 150), self.rect, 2, border_radius=5)
-        
-        # Draw text
-        font = pygame.font.SysFont('Arial', 14, bold=True)
-        text_surface = font.render(self.text, True, (255, 255, 255))
-        text_rect = text_surface.get_rect(center=self.rect.center)
-        surface.blit(text_surface, text_rect)
+        surface.blit(self._surfaces[self.hover], self.rect.topleft)
+        
+        # Draw text; the label never changes, so it is rendered once
+        if self._text_surface is None:
+            self._text_surface = _get_font(14, bold=True).render(self.text, True, (255, 255, 255))
+        text_rect = self._text_surface.get_rect(center=self.rect.center)
+        surface.blit(self._text_surface, text_rect)
+        
+        self._last_rendered_hover = self.hover
 
 
 class ControlPanel:
@@ -157,6 +250,26 @@ class ControlPanel:
         self.border_color = (200, 200, 200)
         self.padding = 10
         self.spacing = 15
+        
+        # Off-screen copy of the static background, border and title
+        self._panel_cache = None
+        self._needs_full_redraw = True
+        
+        # Last rendered panel, reused as-is until a control reports a change
+        self._cached_surface = None
+        self._dirty = True
+        
+        # Slider currently being dragged, and whether the pointer was last seen over the panel
+        self._dragging_control = None
+        self._pointer_inside = False
+        
+        # Hit areas of the controls as parallel arrays, in the order of self.controls,
+        # and the index of the control currently under the pointer (-1 for none)
+        self._x = np.empty(0, dtype=np.int32)
+        self._y = np.empty(0, dtype=np.int32)
+        self._w = np.empty(0, dtype=np.int32)
+        self._h = np.empty(0, dtype=np.int32)
+        self._hover_index = -1
     
     def add_slider(self, name: str, min_val: float, max_val: float, 
                   initial_val: float, label: str = "", unit: str = "") -> Slider:
@@ -177,7 +290,7 @@ class ControlPanel:
             label=label or name,
             unit=unit
         )
-        self.controls.append(slider)
+        self._add_control(slider)
         return slider
     
     def add_button(self, text: str, action: Callable[[], None]) -> Button:
@@ -195,31 +308,132 @@ class ControlPanel:
             text=text,
             action=action
         )
-        self.controls.append(button)
+        self._add_control(button)
         return button
     
+    def _add_control(self, control):
+        """Register a control and its hit area with the panel."""
+        control.on_change = self._mark_dirty
+        self.controls.append(control)
+        
+        # The bounds also cover the slider knob where it overhangs the track
+        bounds = control.bounds
+        self._x = np.append(self._x, np.int32(bounds.x))
+        self._y = np.append(self._y, np.int32(bounds.y))
+        self._w = np.append(self._w, np.int32(bounds.width))
+        self._h = np.append(self._h, np.int32(bounds.height))
+        self._needs_full_redraw = True
+    
     def handle_event(self, event) -> bool:
         """Handle pygame events for all controls.
         
+        Pointer events are hit-tested against all controls at once and passed
+        only to the control under the pointer.
+        
         Returns:
             bool: True if any control handled the event, False otherwise
         """
+        # While a slider is dragged, motion and release only concern that slider
+        if self._dragging_control is not None and \
+           event.type in (pygame.MOUSEMOTION, pygame.MOUSEBUTTONUP):
+            handled = self._dragging_control.handle_event(event)
+            if not self._dragging_control.dragging:
+                self._dragging_control = None
+            return handled
+        
+        # Ignore pointer events outside the panel (button releases still go through)
+        pos = getattr(event, 'pos', None)
+        if pos is not None and event.type != pygame.MOUSEBUTTONUP:
+            inside = self.rect.collidepoint(pos)
+            if not inside:
+                if self._pointer_inside and event.type == pygame.MOUSEMOTION:
+                    # Pointer just left the panel; let the last control drop its hover state
+                    self._pointer_inside = False
+                    if self._hover_index >= 0:
+                        self.controls[self._hover_index].handle_event(event)
+                        self._hover_index = -1
+                return False
+            self._pointer_inside = True
+        
+        if pos is not None:
+            ex, ey = pos
+            mask = (ex >= self._x) & (ex < self._x + self._w) & \
+                   (ey >= self._y) & (ey < self._y + self._h)
+            index = int(mask.argmax()) if mask.any() else -1
+            
+            if event.type == pygame.MOUSEMOTION and index != self._hover_index:
+                # Let the control the pointer moved off drop its hover state
+                if self._hover_index >= 0:
+                    self.controls[self._hover_index].handle_event(event)
+                self._hover_index = index
+            
+            if index < 0:
+                return False
+            control = self.controls[index]
+            if control.handle_event(event):
+                if getattr(control, 'dragging', False):
+                    self._dragging_control = control
+                return True
+            return False
+        
         for control in self.controls:
             if control.handle_event(event):
+                if getattr(control, 'dragging', False):
+                    self._dragging_control = control
                 return True
         return False
     
-    def draw(self, surface):
-        """Draw the control panel and all its controls."""
+    def _mark_dirty(self):
+        """Note that a control changed and the panel must be re-rendered."""
+        self._dirty = True
+    
+    def invalidate(self):
+        """Force the whole panel to be redrawn on the next frame."""
+        self._needs_full_redraw = True
+        self._dirty = True
+    
+    def _build_panel_cache(self):
+        """Render the static panel background, border and title off-screen."""
+        self._panel_cache = pygame.Surface(self.rect.size)
+        local_rect = self._panel_cache.get_rect()
+        
         # Draw panel background
-        pygame.draw.rect(surface, self.background, self.rect)
-        pygame.draw.rect(surface, self.border_color, self.rect, 2)
+        pygame.draw.rect(self._panel_cache, self.background, local_rect)
+        pygame.draw.rect(self._panel_cache, self.border_color, local_rect, 2)
         
         # Draw title
-        font = pygame.font.SysFont('Arial', 16, bold=True)
-        title = font.render("Simulation Controls", True, (0, 0, 0))
-        surface.blit(title, (self.rect.x + self.padding, self.rect.y + self.padding))
+        title = _get_font(16, bold=True).render("Simulation Controls", True, (0, 0, 0))
+        self._panel_cache.blit(title, (self.padding, self.padding))
+    
+    def draw(self, surface):
+        """Draw the control panel and all its controls.
         
-        # Draw all controls
-        for control in self.controls:
-            control.draw(surface)
+        While no control has changed, the previously rendered panel is blitted as a
+        single surface. Otherwise the static chrome comes from an off-screen cache and
+        only controls whose state changed are repainted over their cached background.
+        """
+        if not self._dirty and self._cached_surface is not None:
+            surface.blit(self._cached_surface, self.rect.topleft)
+            return
+        
+        if self._panel_cache is None:
+            self._build_panel_cache()
+        
+        if self._needs_full_redraw:
+            surface.blit(self._panel_cache, self.rect.topleft)
+            for control in self.controls:
+                control.draw(surface)
+            self._needs_full_redraw = False
+        else:
+            for control in self.controls:
+                if control.needs_redraw():
+                    # Restore the chrome under the control, then draw it on top
+                    area = control.bounds.clip(self.rect)
+                    surface.blit(self._panel_cache, area.topleft, area.move(-self.rect.x, -self.rect.y))
+                    control.draw(surface)
+        
+        # Keep a copy of the finished panel for the following clean frames
+        if self._cached_surface is None:
+            self._cached_surface = pygame.Surface(self.rect.size)
+        self._cached_surface.blit(surface, (0, 0), self.rect)
+        self._dirty = False
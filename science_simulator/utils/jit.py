@@ -0,0 +1,20 @@
+"""
+JIT compilation helpers for the Science Simulation Lab.
+
+Exposes Numba's ``njit`` decorator when Numba is installed, and a no-op
+stand-in otherwise so numeric kernels still run as plain Python.
+"""
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    
+    def njit(*args, **kwargs):
+        """Fallback for numba.njit that returns the function unchanged."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        
+        def decorator(func):
+            return func
+        return decorator
@@ -0,0 +1,41 @@
+"""Tests for quantity extraction in the rule-based exercise parser."""
+from science_simulator.parsers.exercise_parser import ExerciseParser
+
+COMPOUND_UNITS = [
+    "A spring with constant 200 N/m",
+    "A car travels at 4 km/h",
+    "A fluid with density 1000 kg/m³",
+    "It accelerates at 10 m/s2",
+    "It accelerates at 3 m/s/s",
+    "A crawl of 2 m/min",
+]
+
+
+def _units(text):
+    parser = ExerciseParser(use_gemma=False)
+    return [(q['value'], q['unit']) for q in parser._extract_quantities(text)]
+
+
+def test_known_units_are_extracted():
+    text = "A 2 kg ball is launched at 45° with 3.5 m/s^2 and 9.8 m/s², 10 g, 20°C, 3 cm."
+    assert _units(text) == [
+        (2.0, 'kg'), (45.0, '°'), (3.5, 'm/s^2'), (9.8, 'm/s²'),
+        (10.0, 'g'), (20.0, '°C'), (3.0, 'cm'),
+    ]
+
+
+def test_unit_prefix_of_a_word_is_ignored():
+    assert _units("It weighs 5 grams") == []
+
+
+def test_compound_units_are_not_matched_by_their_first_part():
+    for text in COMPOUND_UNITS:
+        assert _units(text) == [], text
+
+
+def test_standard_values_are_converted():
+    parser = ExerciseParser(use_gemma=False)
+    quantity, = parser._extract_quantities("A 250 g mass")
+    assert quantity['type'] == 'mass'
+    assert quantity['std_unit'] == 'kg'
+    assert quantity['std_value'] == 0.25
@@ -0,0 +1,72 @@
+"""Tests for exercise loading and parameter storage in SimulationManager."""
+import json
+import os
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SCIENCE_SIM_WARMUP', '0')
+
+import pytest
+
+from science_simulator.core.simulation_manager import SimulationManager
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    # Keep the data directory out of the real home directory
+    monkeypatch.setenv('HOME', str(tmp_path))
+    manager = SimulationManager(use_gemma=False)
+    yield manager
+    manager.close()
+
+
+def _load(manager, tmp_path, exercise):
+    path = tmp_path / 'exercise.json'
+    path.write_text(json.dumps(exercise))
+    return manager.load_exercise(str(path))
+
+
+def test_non_float_parameter_values_are_kept(manager, tmp_path):
+    _load(manager, tmp_path, {
+        'parameters': {
+            'a': {'value': '10'},
+            'b': {'value': True},
+            'c': {'value': None},
+            'd': {'value': 2.5},
+            'e': 3,
+        }
+    })
+    values = {name: config['value'] for name, config in manager.get_parameters().items()}
+    assert values == {'a': '10', 'b': True, 'c': None, 'd': 2.5, 'e': 3}
+    assert type(values['b']) is bool
+
+
+def test_updated_parameter_values_are_kept(manager, tmp_path):
+    _load(manager, tmp_path, {'parameters': {'a': {'value': 1.0}, 'b': {'value': 'x'}}})
+    manager.update_parameter('a', 'fast')
+    manager.update_parameter('b', 4.0)
+    values = {name: config['value'] for name, config in manager.get_parameters().items()}
+    assert values == {'a': 'fast', 'b': 4.0}
+
+
+def test_targets_without_id_do_not_block_loading(manager, tmp_path):
+    exercise = _load(manager, tmp_path, {
+        'targets': [
+            {'type': 'numeric', 'value': 5},
+            {'id': 'range', 'type': 'numeric', 'value': 10, 'tolerance': 0.5},
+        ]
+    })
+    assert len(exercise['targets']) == 2
+    assert list(manager.current_simulation['_targets_by_id']) == ['range']
+
+
+def test_yaml_without_msgpack_loads_the_same_when_cached(manager, tmp_path, monkeypatch):
+    import science_simulator.core.simulation_manager as simulation_manager
+    monkeypatch.setattr(simulation_manager, 'msgpack', None)
+    
+    path = tmp_path / 'exercise.yaml'
+    path.write_text("levels:\n  1: easy\n  2: hard\nupdated: 2024-01-01\n")
+    first = manager._load_yaml(str(path))
+    second = manager._load_yaml(str(path))
+    assert first == second
+    assert list(first['levels']) == [1, 2]
+    assert not list(manager.cache_dir.glob('exercise-*'))